@@ -0,0 +1,81 @@
+"""Benchmark fuer Frame-Aufzaehlung und concat-Liste bei sehr grossen Frame-Sets.
+
+Aufruf:
+
+    PYTHONPATH=src python3 benchmarks/bench_frames.py --frames 100000
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from auto_clip.fs_utils import IMAGE_SUFFIXES, count_frame_files, iter_frame_files
+from auto_clip.steps.render import _write_concat_file
+
+
+def _legacy_list(frame_dir: Path) -> list[Path]:
+    items = [
+        path for path in frame_dir.iterdir()
+        if path.is_file() and path.suffix.lower() in IMAGE_SUFFIXES
+    ]
+    return sorted(items, key=lambda item: item.name.lower())
+
+
+def _legacy_concat(frames: list[Path], concat_file: Path, frame_rate: float) -> None:
+    duration = 1.0 / frame_rate
+    lines: list[str] = []
+    base_dir = concat_file.parent.resolve()
+    for frame in frames:
+        lines.append(f"file {frame.resolve().relative_to(base_dir).as_posix()}")
+        lines.append(f"duration {duration:.6f}")
+    lines.append(f"file {frames[-1].resolve().relative_to(base_dir).as_posix()}")
+    concat_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def _measure(label: str, func) -> None:
+    started = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {elapsed * 1000:9.1f} ms  Peak {peak / 1024 / 1024:7.1f} MiB  -> {result}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        frame_dir = Path(tmp) / "frames"
+        frame_dir.mkdir()
+        for index in range(args.frames):
+            (frame_dir / f"frame_{index}.jpg").touch()
+        print(f"{args.frames} Frames in {frame_dir}")
+
+        _measure("legacy iterdir+sort", lambda: len(_legacy_list(frame_dir)))
+        _measure("count_frame_files", lambda: count_frame_files(frame_dir))
+        _measure("iter_frame_files", lambda: sum(1 for _ in iter_frame_files(frame_dir)))
+
+        concat_file = Path(tmp) / "frames.txt"
+        legacy_frames = _legacy_list(frame_dir)
+        _measure("legacy concat", lambda: _legacy_concat(legacy_frames, concat_file, 1.2))
+        _measure(
+            "streaming concat",
+            lambda: _write_concat_file(
+                (f"frames/{path.name}" for path in iter_frame_files(frame_dir)),
+                concat_file,
+                1.2,
+            )[0],
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,73 @@
+"""Kleiner Lasttest fuer `auto-clip serve` mit Keep-Alive-Verbindungen.
+
+Aufruf:
+
+    PYTHONPATH=src python3 -m auto_clip.cli serve --port 8000 &
+    python3 benchmarks/load_test.py --url http://127.0.0.1:8000/data/catalog.json --connections 16 --seconds 10
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def _worker(host: str, port: int, path: str, headers: dict[str, str], deadline: float, results: list) -> None:
+    requests = 0
+    received = 0
+    errors = 0
+    connection = http.client.HTTPConnection(host, port, timeout=10)
+    while time.perf_counter() < deadline:
+        try:
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            received += len(response.read())
+            if response.status >= 400:
+                errors += 1
+            requests += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            connection.close()
+            connection = http.client.HTTPConnection(host, port, timeout=10)
+    connection.close()
+    results.append((requests, received, errors))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000/")
+    parser.add_argument("--connections", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--range", help="Optionaler Range-Header, z. B. bytes=0-65535")
+    args = parser.parse_args()
+
+    url = urlsplit(args.url)
+    headers = {"Range": args.range} if args.range else {}
+    results: list[tuple[int, int, int]] = []
+    deadline = time.perf_counter() + args.seconds
+    threads = [
+        threading.Thread(
+            target=_worker,
+            args=(url.hostname, url.port or 80, url.path or "/", headers, deadline, results),
+        )
+        for _ in range(args.connections)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    requests = sum(item[0] for item in results)
+    received = sum(item[1] for item in results)
+    errors = sum(item[2] for item in results)
+    print(f"{requests} Anfragen in {elapsed:.1f} s: {requests / elapsed:.0f} req/s, "
+          f"{received / elapsed / 1024 / 1024:.1f} MiB/s, {errors} Fehler")
+    return 0 if not errors else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
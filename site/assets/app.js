@@ -2,6 +2,14 @@ const statusEl = document.getElementById("status");
 const katalogEl = document.getElementById("katalog");
 const detailEl = document.getElementById("detail");
 const playerEl = document.getElementById("player");
+const filterEl = document.getElementById("filter");
+const trefferEl = document.getElementById("treffer");
+
+const INDEX_ROOT = "./data/index/";
+const FACETTEN = ["fuel", "transmission", "color"];
+const BEREICHE = ["price_eur", "year", "mileage_km"];
+const MAX_LISTE = 50;
+const indexDateien = new Map();
 
 const felder = {
   titel: document.getElementById("titel"),
@@ -29,6 +37,19 @@ function liesJobAusQuery() {
   return params.get("job");
 }
 
+// Gleicher FNV-1a-Hash wie `auto_clip.layout.shard_parts`.
+function shardPrefix(jobId, layout) {
+  if (layout !== "sharded") {
+    return "";
+  }
+  let wert = 0x811c9dc5;
+  for (const byte of new TextEncoder().encode(jobId)) {
+    wert = Math.imul(wert ^ byte, 0x01000193) >>> 0;
+  }
+  const hex = wert.toString(16).padStart(8, "0");
+  return `${hex.slice(0, 2)}/${hex.slice(2, 4)}/`;
+}
+
 async function ladeJson(pfad) {
   const antwort = await fetch(pfad, { cache: "no-store" });
   if (!antwort.ok) {
@@ -39,7 +60,9 @@ async function ladeJson(pfad) {
 
 function setzeAktivenJob(job) {
   detailEl.classList.remove("verborgen");
-  statusEl.textContent = "";
+  statusEl.textContent = job.render && job.render.profile === "preview"
+    ? "Vorschau in reduzierter Qualitaet, die Vollversion folgt."
+    : "";
   playerEl.src = job.public.video_url;
   playerEl.poster = job.public.poster_url;
 
@@ -56,30 +79,134 @@ function setzeAktivenJob(job) {
   felder.listing.textContent = job.vehicle.listing_url;
 }
 
-function schreibeKatalog(katalog) {
+function schreibeKatalog(eintraege) {
   katalogEl.innerHTML = "";
-  katalog.forEach((eintrag) => {
+  eintraege.forEach((eintrag) => {
     const li = document.createElement("li");
     const a = document.createElement("a");
     a.href = `?job=${encodeURIComponent(eintrag.job_id)}`;
-    a.textContent = `${eintrag.vehicle.title} - ${geldwert(eintrag.vehicle.price_eur)}`;
+    a.textContent = `${eintrag.title} - ${geldwert(eintrag.price_eur)}`;
     li.appendChild(a);
     katalogEl.appendChild(li);
   });
 }
 
+function ladeIndex(name) {
+  if (!indexDateien.has(name)) {
+    indexDateien.set(name, ladeJson(INDEX_ROOT + name));
+  }
+  return indexDateien.get(name);
+}
+
+function untereGrenze(werte, ziel) {
+  let links = 0;
+  let rechts = werte.length;
+  while (links < rechts) {
+    const mitte = (links + rechts) >> 1;
+    if (werte[mitte] < ziel) links = mitte + 1;
+    else rechts = mitte;
+  }
+  return links;
+}
+
+function obereGrenze(werte, ziel) {
+  let links = 0;
+  let rechts = werte.length;
+  while (links < rechts) {
+    const mitte = (links + rechts) >> 1;
+    if (werte[mitte] <= ziel) links = mitte + 1;
+    else rechts = mitte;
+  }
+  return links;
+}
+
+function schnittmenge(mengen) {
+  const sortiert = [...mengen].sort((a, b) => a.size - b.size);
+  const [kleinste, ...rest] = sortiert;
+  return new Set([...kleinste].filter((zeile) => rest.every((menge) => menge.has(zeile))));
+}
+
+function liesZahl(name) {
+  const wert = filterEl.elements[name].value;
+  return wert === "" ? null : Number(wert);
+}
+
+async function zeilenFuerFilter(meta) {
+  const mengen = [];
+
+  for (const feld of FACETTEN) {
+    const code = filterEl.elements[feld].value;
+    if (code === "") continue;
+    const posting = await ladeIndex(meta.postings[feld][Number(code)]);
+    mengen.push(new Set(posting.rows));
+  }
+
+  for (const feld of BEREICHE) {
+    const min = liesZahl(`${feld}_min`);
+    const max = liesZahl(`${feld}_max`);
+    if (min === null && max === null) continue;
+    const bereich = await ladeIndex(meta.ranges[feld].path);
+    const von = min === null ? 0 : untereGrenze(bereich.values, min);
+    const bis = max === null ? bereich.values.length : obereGrenze(bereich.values, max);
+    mengen.push(new Set(bereich.rows.slice(von, bis)));
+  }
+
+  if (!mengen.length) {
+    return [...Array(meta.row_count).keys()];
+  }
+  return [...schnittmenge(mengen)].sort((a, b) => a - b);
+}
+
+async function ladeZeilen(meta, zeilen) {
+  const seiten = [...new Set(zeilen.map((zeile) => Math.floor(zeile / meta.rows_per_page)))];
+  const geladen = await Promise.all(seiten.map((seite) => ladeIndex(meta.row_pages[seite])));
+  const nachSeite = new Map(seiten.map((seite, position) => [seite, geladen[position]]));
+  return zeilen.map((zeile) => {
+    const seite = nachSeite.get(Math.floor(zeile / meta.rows_per_page));
+    const [job_id, title, price_eur] = seite.rows[zeile - seite.start];
+    return { job_id, title, price_eur };
+  });
+}
+
+function fuelleFilter(meta) {
+  FACETTEN.forEach((feld) => {
+    const auswahl = filterEl.elements[feld];
+    meta.dictionaries[feld].forEach((wert, code) => {
+      const option = document.createElement("option");
+      option.value = String(code);
+      option.textContent = `${wert} (${meta.counts[feld][code]})`;
+      auswahl.appendChild(option);
+    });
+  });
+}
+
+async function aktualisiereListe(meta) {
+  const zeilen = await zeilenFuerFilter(meta);
+  trefferEl.textContent = `${zeilen.length} von ${meta.row_count} Fahrzeugen`;
+  const eintraege = await ladeZeilen(meta, zeilen.slice(0, MAX_LISTE));
+  schreibeKatalog(eintraege);
+  return eintraege;
+}
+
 async function start() {
   try {
-    const katalog = await ladeJson("./data/catalog.json");
-    schreibeKatalog(katalog.items);
+    const meta = await ladeIndex("meta.json");
+    fuelleFilter(meta);
+    const eintraege = await aktualisiereListe(meta);
+
+    filterEl.addEventListener("change", () => {
+      aktualisiereListe(meta).catch((fehler) => {
+        statusEl.textContent = `Fehler: ${fehler.message}`;
+      });
+    });
 
-    if (!katalog.items.length) {
+    if (!meta.row_count) {
       statusEl.textContent = "Noch keine Clips veroeffentlicht.";
       return;
     }
 
-    const jobId = liesJobAusQuery() || katalog.items[0].job_id;
-    const job = await ladeJson(`./data/${encodeURIComponent(jobId)}.json`);
+    const jobId = liesJobAusQuery() || eintraege[0].job_id;
+    const job = await ladeJson(`./data/${shardPrefix(jobId, meta.layout)}${encodeURIComponent(jobId)}.json`);
     setzeAktivenJob(job);
   } catch (fehler) {
     statusEl.textContent = `Fehler: ${fehler.message}`;
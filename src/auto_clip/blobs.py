@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+from auto_clip.config import AppConfig
+from auto_clip.fs_utils import copy_file, ensure_dir
+
+
+def file_sha256(path: Path) -> str:
+    with path.open("rb") as handle:
+        return hashlib.file_digest(handle, "sha256").hexdigest()
+
+
+class BlobStore:
+    """Inhaltsadressierter Ablageort fuer Dateien, die viele Jobs teilen.
+
+    Jede Datei liegt genau einmal unter `<root>/<ab>/<sha256>`; Jobs und das
+    Public-Bundle erhalten Hardlinks darauf. Der Linkzaehler des Dateisystems
+    ist zugleich der Referenzzaehler: ein Blob mit `st_nlink == 1` wird von
+    niemandem mehr benutzt und darf entfernt werden. Verlinkte Dateien duerfen
+    deshalb nie an Ort und Stelle beschrieben werden, nur per Rename ersetzt
+    oder vorher geloescht.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def path_for(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def put(self, source: Path, *, adopt: bool = False) -> str:
+        """Legt den Inhalt von `source` ab, falls er noch fehlt, und liefert den Hash.
+
+        Mit `adopt=True` wird `source` selbst zum Blob (Hardlink statt Kopie)
+        oder, wenn der Inhalt schon vorhanden ist, durch einen Link darauf
+        ersetzt. Das ist nur fuer eigene Artefakte gedacht, nie fuer Eingaben.
+        """
+        digest = file_sha256(source)
+        blob = self.path_for(digest)
+        if blob.exists():
+            if adopt and not os.path.samefile(blob, source):
+                self.link(digest, source)
+            return digest
+
+        ensure_dir(blob.parent)
+        temp = blob.with_name(f"{digest}.{uuid.uuid4().hex}.tmp")
+        try:
+            try:
+                if not adopt:
+                    raise OSError
+                os.link(source, temp)
+            except OSError:
+                shutil.copyfile(source, temp)
+            temp.replace(blob)
+        finally:
+            temp.unlink(missing_ok=True)
+        return digest
+
+    def link(self, digest: str, target: Path) -> bool:
+        """Verlinkt den Blob nach `target`; ohne Hardlink-Unterstuetzung wird kopiert.
+
+        Gibt `True` zurueck, wenn ein Hardlink entstanden ist.
+        """
+        blob = self.path_for(digest)
+        if target.exists() and os.path.samefile(blob, target):
+            return True
+        ensure_dir(target.parent)
+        temp = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            os.link(blob, temp)
+        except OSError:
+            # Anderes Dateisystem oder keine Hardlinks: dann eben eine Kopie.
+            copy_file(blob, target)
+            return False
+        temp.replace(target)
+        return True
+
+    def place(self, source: Path, target: Path) -> str:
+        """Kurzform fuer `put` plus `link`."""
+        digest = self.put(source)
+        self.link(digest, target)
+        return digest
+
+    def iter_blobs(self):
+        if not self.root.exists():
+            return
+        for shard in sorted(self.root.iterdir()):
+            if not shard.is_dir():
+                continue
+            with os.scandir(shard) as entries:
+                for entry in entries:
+                    if entry.is_file(follow_symlinks=False) and not entry.name.endswith(".tmp"):
+                        yield Path(entry.path), entry.stat(follow_symlinks=False)
+
+    def _reference_counts(self, reference_root: Path) -> dict[tuple[int, int], int]:
+        counts: dict[tuple[int, int], int] = {}
+        for directory, _dirs, files in os.walk(reference_root):
+            for name in files:
+                try:
+                    stat = os.stat(os.path.join(directory, name), follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+                if stat.st_nlink > 1:
+                    key = (stat.st_dev, stat.st_ino)
+                    counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def stats(self, reference_root: Path | None = None) -> dict:
+        """Kennzahlen zur Deduplizierung.
+
+        Mit `reference_root` (den Job-Ordnern) zaehlen nur Links von dort als
+        Referenz; Links aus dem Public-Bundle oder alten Builds stehen getrennt
+        unter `other_links` und heben die Quote nicht an. Ohne `reference_root`
+        zaehlt jeder Hardlink.
+        """
+        job_links = self._reference_counts(reference_root) if reference_root is not None else None
+        blob_count = 0
+        unique_bytes = 0
+        referenced_bytes = 0
+        references = 0
+        other_links = 0
+        logical_bytes = 0
+        for _path, stat in self.iter_blobs():
+            links = stat.st_nlink - 1
+            users = links if job_links is None else job_links.get((stat.st_dev, stat.st_ino), 0)
+            blob_count += 1
+            unique_bytes += stat.st_size
+            references += users
+            other_links += links - users
+            logical_bytes += stat.st_size * users
+            if users:
+                referenced_bytes += stat.st_size
+        return {
+            "blob_count": blob_count,
+            "reference_count": references,
+            "other_links": other_links,
+            "unique_bytes": unique_bytes,
+            "logical_bytes": logical_bytes,
+            "bytes_saved": max(logical_bytes - referenced_bytes, 0),
+            "dedup_ratio": round(logical_bytes / referenced_bytes, 3) if referenced_bytes else 1.0,
+        }
+
+
+def blob_store_for(config: AppConfig) -> BlobStore | None:
+    if not config.blobs.enabled:
+        return None
+    return BlobStore(config.paths.build_root / "blobs")
@@ -1,16 +1,30 @@
 from __future__ import annotations
 
 import argparse
+import json
 import logging
 import shutil
 import time
 from pathlib import Path
 
+from auto_clip.blobs import BlobStore
 from auto_clip.config import load_config
+from auto_clip.layout import jobs_root, locate_job_dir, migrate_jobs
+from auto_clip.leases import (
+    ClaimedManifest,
+    LeaseHeartbeat,
+    claim_manifest,
+    owns_lease,
+    reclaim_expired_leases,
+    release_lease,
+)
 from auto_clip.logging_utils import configure_logging
-from auto_clip.pipeline import process_manifest
+from auto_clip.pipeline import prefetch_narrations, process_manifest
 from auto_clip.publish import build_public_bundle
 from auto_clip.qa import audit_job_directory, audit_public_bundle
+from auto_clip.retention import collect_garbage, load_active_ids
+from auto_clip.serve import serve
+from auto_clip.tts import SpeechSynthesizer, build_synthesizer
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +35,11 @@ def _build_parser() -> argparse.ArgumentParser:
 
     run_job = sub.add_parser("run-job", help="Genau ein Manifest verarbeiten")
     run_job.add_argument("manifest", help="Pfad zur Manifest-Datei")
+    run_job.add_argument(
+        "--preview",
+        action="store_true",
+        help="Schnelle Vorschau rendern und veroeffentlichen; Vollrender wird im Eingang eingereiht",
+    )
 
     sub.add_parser("publish", help="Public-Bundle aus allen erfolgreichen Jobs neu bauen")
 
@@ -29,14 +48,25 @@ def _build_parser() -> argparse.ArgumentParser:
 
     doctor = sub.add_parser("doctor", help="Lokalen Job und Public-Bundle pruefen")
     doctor.add_argument("--job-id", help="Optionaler Job fuer Detailpruefung")
+    doctor.add_argument("--verify", action="store_true", help="SHA-256 der Public-Assets gegen asset-manifest.json pruefen")
 
-    return parser
+    gc = sub.add_parser("gc", help="Zwischenstaende und alte Artefakte nach Aufbewahrungsregeln entfernen")
+    gc.add_argument("--active-ids", help="Datei mit aktiven Job-IDs; alle anderen Jobs werden entfernt")
+    gc.add_argument("--dry-run", action="store_true", help="Nur berichten, nichts loeschen")
+    gc.add_argument("--force", action="store_true", help="Auch mit leerer Liste aktiver IDs aufraeumen")
 
+    migrate = sub.add_parser("migrate-layout", help="Job-Ordner ins konfigurierte Layout (paths.job_layout) verschieben")
+    migrate.add_argument("--dry-run", action="store_true", help="Nur berichten, nichts verschieben")
+    migrate.add_argument("--publish", action="store_true", help="Public-Bundle danach im neuen Layout neu bauen")
 
-def _claim_manifest(source: Path, working_dir: Path) -> Path:
-    target = working_dir / source.name
-    source.replace(target)
-    return target
+    sub.add_parser("blobs", help="Belegung und Deduplizierung des Blob-Stores anzeigen")
+
+    serve = sub.add_parser("serve", help="Public-Bundle mit Range-, ETag- und gzip-Unterstuetzung ausliefern")
+    serve.add_argument("--host", default="127.0.0.1", help="Adresse zum Lauschen")
+    serve.add_argument("--port", type=int, default=8000, help="Port zum Lauschen")
+    serve.add_argument("--root", help="Alternatives Wurzelverzeichnis statt dist/public")
+
+    return parser
 
 
 def _archive_manifest(source: Path, target_dir: Path) -> Path:
@@ -51,14 +81,42 @@ def _write_failure_note(target: Path, message: str) -> None:
     target.write_text(message + "\n", encoding="utf-8")
 
 
-def _run_one_manifest(manifest_path: Path, config) -> None:
-    process_manifest(manifest_path, config)
+def _finish_manifest(
+    claimed: ClaimedManifest,
+    done_dir: Path,
+    failed_dir: Path,
+    *,
+    lost: bool,
+    error: Exception | None,
+) -> None:
+    """Archiviert das Manifest oder legt es unter `failed/` ab, aber nur mit gueltiger Lease.
+
+    Ist die Lease verloren, hat womoeglich schon ein anderer Worker dasselbe
+    `working/<name>` uebernommen; dann bleibt alles liegen, wie es ist.
+    """
+    if lost or not owns_lease(claimed):
+        logger.warning("Lease verloren, Manifest gehoert nicht mehr diesem Worker: %s", claimed.manifest_path.name)
+        return
+    try:
+        if error is None:
+            archived = _archive_manifest(claimed.manifest_path, done_dir)
+            logger.info("Manifest erfolgreich archiviert: %s", archived)
+        elif claimed.manifest_path.exists():
+            shutil.copy2(claimed.manifest_path, failed_dir / claimed.manifest_path.name)
+            _write_failure_note(failed_dir / f"{claimed.manifest_path.stem}.error.txt", str(error))
+            claimed.manifest_path.unlink(missing_ok=True)
+    finally:
+        release_lease(claimed)
+
+
+def _run_one_manifest(manifest_path: Path, config, synthesizer: SpeechSynthesizer | None = None) -> None:
+    process_manifest(manifest_path, config, synthesizer)
 
 
 def command_run_job(args: argparse.Namespace) -> int:
     config = load_config()
     manifest_path = Path(args.manifest).expanduser().resolve()
-    _run_one_manifest(manifest_path, config)
+    process_manifest(manifest_path, config, render_profile="preview" if args.preview else None)
     return 0
 
 
@@ -80,26 +138,62 @@ def command_watch(args: argparse.Namespace) -> int:
     ]:
         path.mkdir(parents=True, exist_ok=True)
 
+    synthesizer = build_synthesizer(config)
+    try:
+        return _watch_loop(args, config, synthesizer)
+    finally:
+        if synthesizer is not None:
+            synthesizer.close()
+
+
+def _watch_loop(args: argparse.Namespace, config, synthesizer: SpeechSynthesizer | None) -> int:
+    last_gc = time.monotonic()
     while True:
+        reclaim_expired_leases(
+            config.paths.jobs_working,
+            config.paths.jobs_inbox,
+            config.paths.jobs_failed,
+            lease_seconds=config.watch.lease_seconds,
+            max_attempts=config.watch.max_attempts,
+        )
+
         found = False
-        for manifest in sorted(config.paths.jobs_inbox.glob("*.json")):
-            found = True
-            claimed = _claim_manifest(manifest, config.paths.jobs_working)
-            logger.info("Manifest uebernommen: %s", claimed.name)
+        pending = sorted(config.paths.jobs_inbox.glob("*.json"))
+        if synthesizer is not None and pending:
+            prefetch_narrations(pending, config, synthesizer)
 
+        for manifest in pending:
+            found = True
+            claimed = claim_manifest(manifest, config.paths.jobs_working, lease_seconds=config.watch.lease_seconds)
+            if claimed is None:
+                logger.debug("Manifest bereits von anderem Worker uebernommen: %s", manifest.name)
+                continue
+            logger.info("Manifest uebernommen: %s (Versuch %s)", claimed.manifest_path.name, claimed.lease.attempt)
+
+            heartbeat = LeaseHeartbeat(
+                claimed,
+                lease_seconds=config.watch.lease_seconds,
+                heartbeat_seconds=config.watch.heartbeat_seconds,
+            )
+            error: Exception | None = None
             try:
-                _run_one_manifest(claimed, config)
-                archived = _archive_manifest(claimed, config.paths.jobs_done)
-                logger.info("Manifest erfolgreich archiviert: %s", archived)
+                with heartbeat:
+                    _run_one_manifest(claimed.manifest_path, config, synthesizer)
             except Exception as exc:
-                failed_manifest = config.paths.jobs_failed / claimed.name
-                shutil.copy2(claimed, failed_manifest)
-                _write_failure_note(
-                    config.paths.jobs_failed / f"{claimed.stem}.error.txt",
-                    str(exc),
-                )
-                claimed.unlink(missing_ok=True)
                 logger.exception("Job fehlgeschlagen: %s", exc)
+                error = exc
+            try:
+                _finish_manifest(claimed, config.paths.jobs_done, config.paths.jobs_failed, lost=heartbeat.lost, error=error)
+            except OSError as exc:
+                logger.exception("Manifest konnte nicht abgeschlossen werden: %s", exc)
+
+        interval = config.retention.gc_interval_seconds
+        if interval > 0 and time.monotonic() - last_gc >= interval:
+            last_gc = time.monotonic()
+            try:
+                _run_gc(config)
+            except Exception as exc:
+                logger.exception("GC fehlgeschlagen: %s", exc)
 
         if args.once:
             return 0
@@ -111,14 +205,55 @@ def command_watch(args: argparse.Namespace) -> int:
     return 0
 
 
+def _run_gc(config, active_ids_file: Path | None = None, dry_run: bool = False, force: bool = False) -> dict:
+    active_ids_file = active_ids_file or config.retention.active_ids_file
+    active_ids = load_active_ids(active_ids_file) if active_ids_file else None
+    return collect_garbage(config, active_ids=active_ids, dry_run=dry_run, force=force)
+
+
+def command_gc(args: argparse.Namespace) -> int:
+    config = load_config()
+    active_ids_file = Path(args.active_ids).expanduser().resolve() if args.active_ids else None
+    try:
+        report = _run_gc(config, active_ids_file, args.dry_run, args.force)
+    except ValueError as exc:
+        logger.error("%s", exc)
+        return 2
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0
+
+
+def command_migrate_layout(args: argparse.Namespace) -> int:
+    config = load_config()
+    report = migrate_jobs(config, dry_run=args.dry_run)
+    if args.publish and not args.dry_run:
+        report["published_jobs"] = build_public_bundle(config)["job_count"]
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    return 0
+
+
+def command_blobs(_: argparse.Namespace) -> int:
+    config = load_config()
+    store = BlobStore(config.paths.build_root / "blobs")
+    print(json.dumps(store.stats(jobs_root(config)), indent=2, ensure_ascii=False))
+    return 0
+
+
+def command_serve(args: argparse.Namespace) -> int:
+    config = load_config()
+    public_root = Path(args.root).expanduser().resolve() if args.root else config.paths.build_root / "public"
+    serve(public_root, args.host, args.port)
+    return 0
+
+
 def command_doctor(args: argparse.Namespace) -> int:
     config = load_config()
     public_root = config.paths.build_root / "public"
-    public_report = audit_public_bundle(public_root, args.job_id)
+    public_report = audit_public_bundle(public_root, args.job_id, verify_checksums=args.verify)
     print("Public:", public_report)
 
     if args.job_id:
-        job_dir = config.paths.build_root / "jobs" / args.job_id
+        job_dir = locate_job_dir(config, args.job_id)
         local_report = audit_job_directory(job_dir)
         print("Lokal:", local_report)
 
@@ -138,6 +273,14 @@ def main() -> int:
         return command_watch(args)
     if args.command == "doctor":
         return command_doctor(args)
+    if args.command == "gc":
+        return command_gc(args)
+    if args.command == "migrate-layout":
+        return command_migrate_layout(args)
+    if args.command == "blobs":
+        return command_blobs(args)
+    if args.command == "serve":
+        return command_serve(args)
 
     parser.error("Unbekanntes Kommando")
     return 2
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import json
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
 
@@ -14,6 +14,7 @@ class PathConfig:
     jobs_failed: Path
     build_root: Path
     site_root: Path
+    job_layout: str = "flat"
 
 
 @dataclass(frozen=True)
@@ -24,16 +25,58 @@ class RenderConfig:
     codec: str
     crf: int
     audio_bitrate: str
+    segment_frames: int = 0
+    preset: str | None = None
+
+
+@dataclass(frozen=True)
+class PreviewConfig:
+    width: int = 640
+    height: int = 360
+    crf: int = 32
+    preset: str = "ultrafast"
 
 
 @dataclass(frozen=True)
 class WatchConfig:
     poll_seconds: int
+    lease_seconds: int = 120
+    heartbeat_seconds: int = 30
+    max_attempts: int = 3
 
 
 @dataclass(frozen=True)
 class VoiceConfig:
     fallback_duration_seconds: int
+    provider: str | None = None
+    voice: str = "de-DE"
+    max_workers: int = 2
+
+
+@dataclass(frozen=True)
+class ContentConfig:
+    template_dir: Path | None = None
+    locale: str = "de_DE"
+
+
+@dataclass(frozen=True)
+class RetentionConfig:
+    keep_failed: int = 20
+    max_job_bytes: int | None = None
+    max_cache_bytes: int | None = None
+    min_age_seconds: int = 3600
+    active_ids_file: Path | None = None
+    gc_interval_seconds: int = 0
+
+
+@dataclass(frozen=True)
+class PublishConfig:
+    copy_workers: int = 4
+
+
+@dataclass(frozen=True)
+class BlobConfig:
+    enabled: bool = True
 
 
 @dataclass(frozen=True)
@@ -47,12 +90,28 @@ class AppConfig:
     base_url: str
     ffmpeg_bin: str
     ffprobe_bin: str
+    content: ContentConfig = field(default_factory=ContentConfig)
+    retention: RetentionConfig = field(default_factory=RetentionConfig)
+    preview: PreviewConfig = field(default_factory=PreviewConfig)
+    blobs: BlobConfig = field(default_factory=BlobConfig)
+    publish: PublishConfig = field(default_factory=PublishConfig)
 
 
 def _resolve(base: Path, value: str) -> Path:
     return (base / value).resolve()
 
 
+def _optional_int(value: object) -> int | None:
+    return None if value is None else int(value)
+
+
+def _job_layout(value: object) -> str:
+    layout = str(value)
+    if layout not in ("flat", "sharded"):
+        raise ValueError(f"Unbekanntes Job-Layout: {layout}")
+    return layout
+
+
 def load_config(config_path: str | None = None) -> AppConfig:
     raw_path = config_path or os.getenv("AUTO_CLIP_CONFIG", "auto-clip.config.json")
     path = Path(raw_path).expanduser().resolve()
@@ -63,6 +122,11 @@ def load_config(config_path: str | None = None) -> AppConfig:
     render = data["render"]
     watch = data["watch"]
     voice = data["voice"]
+    content = data.get("content", {})
+    retention = data.get("retention", {})
+    preview = data.get("preview", {})
+    blobs = data.get("blobs", {})
+    publish = data.get("publish", {})
 
     return AppConfig(
         project_root=base,
@@ -74,6 +138,7 @@ def load_config(config_path: str | None = None) -> AppConfig:
             jobs_failed=_resolve(base, paths["jobs_failed"]),
             build_root=_resolve(base, paths["build_root"]),
             site_root=_resolve(base, paths["site_root"]),
+            job_layout=_job_layout(paths.get("job_layout", "flat")),
         ),
         render=RenderConfig(
             frame_rate=float(render["frame_rate"]),
@@ -82,14 +147,42 @@ def load_config(config_path: str | None = None) -> AppConfig:
             codec=str(render["codec"]),
             crf=int(render["crf"]),
             audio_bitrate=str(render["audio_bitrate"]),
+            segment_frames=int(render.get("segment_frames", 0)),
+            preset=render.get("preset") or None,
         ),
         watch=WatchConfig(
             poll_seconds=int(watch["poll_seconds"]),
+            lease_seconds=int(watch.get("lease_seconds", 120)),
+            heartbeat_seconds=int(watch.get("heartbeat_seconds", 30)),
+            max_attempts=int(watch.get("max_attempts", 3)),
         ),
         voice=VoiceConfig(
             fallback_duration_seconds=int(voice["fallback_duration_seconds"]),
+            provider=voice.get("provider") or None,
+            voice=str(voice.get("voice", "de-DE")),
+            max_workers=int(voice.get("max_workers", 2)),
         ),
         base_url=os.getenv("AUTO_CLIP_BASE_URL", "http://localhost:8000").rstrip("/"),
         ffmpeg_bin=os.getenv("AUTO_CLIP_FFMPEG_BIN", "ffmpeg"),
         ffprobe_bin=os.getenv("AUTO_CLIP_FFPROBE_BIN", "ffprobe"),
+        content=ContentConfig(
+            template_dir=_resolve(base, content["template_dir"]) if content.get("template_dir") else None,
+            locale=str(content.get("locale", "de_DE")),
+        ),
+        retention=RetentionConfig(
+            keep_failed=int(retention.get("keep_failed", 20)),
+            max_job_bytes=_optional_int(retention.get("max_job_bytes")),
+            max_cache_bytes=_optional_int(retention.get("max_cache_bytes")),
+            min_age_seconds=int(retention.get("min_age_seconds", 3600)),
+            active_ids_file=_resolve(base, retention["active_ids_file"]) if retention.get("active_ids_file") else None,
+            gc_interval_seconds=int(retention.get("gc_interval_seconds", 0)),
+        ),
+        preview=PreviewConfig(
+            width=int(preview.get("width", 640)),
+            height=int(preview.get("height", 360)),
+            crf=int(preview.get("crf", 32)),
+            preset=str(preview.get("preset", "ultrafast")),
+        ),
+        blobs=BlobConfig(enabled=bool(blobs.get("enabled", True))),
+        publish=PublishConfig(copy_workers=max(int(publish.get("copy_workers", 4)), 1)),
     )
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from typing import Iterable
+
+
+FACET_FIELDS = ("fuel", "color", "transmission")
+RANGE_FIELDS = ("price_eur", "year", "mileage_km")
+ROWS_PER_PAGE = 256
+INDEX_VERSION = 2
+
+
+def build_facet_index(catalog_items: list[dict]) -> dict[str, dict]:
+    """Baut einen spaltenorientierten Filterindex ueber den Katalog.
+
+    Zeilen-IDs sind die Positionen im Katalog. Ergebnis ist eine Abbildung
+    `relativer Pfad unter data/index/ -> JSON-Inhalt`:
+
+    - `meta.json`: Zeilenzahl, Woerterbuecher fuer `fuel`/`color`/`transmission`,
+      Trefferzahlen je Wert und die Pfade aller uebrigen Dateien. Die Groesse
+      haengt nur von der Zahl der Werte ab, nicht von der Zahl der Fahrzeuge,
+      denn jede Seite laedt sie zuerst.
+    - `column-<feld>.json`: kodierte Spalte, ein Code je Zeile.
+    - `facet-<feld>-<code>.json`: sortierte Posting-Liste der Zeilen-IDs.
+    - `range-<feld>.json`: aufsteigend sortierte Werte mit passenden Zeilen-IDs,
+      sodass ein Bereich per Binaersuche zu einem Zeilenausschnitt wird.
+    - `rows-<seite>.json`: `[job_id, titel, preis]` je Zeile, seitenweise, damit
+      eine Trefferliste ohne Einzelabrufe pro Fahrzeug angezeigt werden kann.
+    """
+    vehicles = [item["vehicle"] for item in catalog_items]
+    files: dict[str, dict] = {}
+
+    dictionaries: dict[str, list[str]] = {}
+    columns: dict[str, str] = {}
+    counts: dict[str, list[int]] = {}
+    postings: dict[str, list[str]] = {}
+    for field in FACET_FIELDS:
+        values = sorted({str(vehicle[field]) for vehicle in vehicles})
+        codes = {value: code for code, value in enumerate(values)}
+        column = [codes[str(vehicle[field])] for vehicle in vehicles]
+        rows_by_code: list[list[int]] = [[] for _ in values]
+        for row, code in enumerate(column):
+            rows_by_code[code].append(row)
+
+        dictionaries[field] = values
+        columns[field] = f"column-{field}.json"
+        files[columns[field]] = {"field": field, "codes": column}
+        counts[field] = [len(rows) for rows in rows_by_code]
+        postings[field] = []
+        for code, rows in enumerate(rows_by_code):
+            name = f"facet-{field}-{code}.json"
+            files[name] = {"field": field, "value": values[code], "rows": rows}
+            postings[field].append(name)
+
+    ranges: dict[str, dict] = {}
+    for field in RANGE_FIELDS:
+        order = sorted(range(len(vehicles)), key=lambda row: (vehicles[row][field], row))
+        name = f"range-{field}.json"
+        files[name] = {
+            "field": field,
+            "values": [vehicles[row][field] for row in order],
+            "rows": order,
+        }
+        ranges[field] = {
+            "path": name,
+            "min": vehicles[order[0]][field] if order else None,
+            "max": vehicles[order[-1]][field] if order else None,
+        }
+
+    row_pages = []
+    for page, start in enumerate(range(0, len(catalog_items), ROWS_PER_PAGE)):
+        name = f"rows-{page}.json"
+        files[name] = {"start": start, "rows": list(_row_labels(catalog_items[start:start + ROWS_PER_PAGE]))}
+        row_pages.append(name)
+
+    files["meta.json"] = {
+        "version": INDEX_VERSION,
+        "row_count": len(catalog_items),
+        "rows_per_page": ROWS_PER_PAGE,
+        "row_pages": row_pages,
+        "dictionaries": dictionaries,
+        "columns": columns,
+        "counts": counts,
+        "postings": postings,
+        "ranges": ranges,
+    }
+    return files
+
+
+def _row_labels(items: Iterable[dict]) -> Iterable[list]:
+    for item in items:
+        vehicle = item["vehicle"]
+        yield [item["job_id"], vehicle["title"], vehicle["price_eur"]]
@@ -1,12 +1,21 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import os
+import re
 import shutil
+import uuid
 from pathlib import Path
+from typing import Iterator
 
 
+COPY_CHUNK_BYTES = 8 * 1024 * 1024
+
 IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".ppm", ".bmp", ".webp"}
 
+_DIGITS_RE = re.compile(r"(\d+)")
+
 
 def ensure_dir(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
@@ -19,21 +28,100 @@ def atomic_write_text(path: Path, content: str) -> None:
     temp.replace(path)
 
 
-def atomic_write_json(path: Path, payload: dict) -> None:
+def atomic_write_json(path: Path, payload: dict, *, compact: bool = False) -> None:
+    if compact:
+        atomic_write_text(path, json.dumps(payload, separators=(",", ":"), ensure_ascii=False) + "\n")
+        return
     atomic_write_text(path, json.dumps(payload, indent=2, ensure_ascii=False) + "\n")
 
 
 def copy_file(source: Path, target: Path) -> None:
+    """Kopiert ueber eine temporaere Datei, damit ein Hardlink am Ziel nie beschrieben wird."""
     ensure_dir(target.parent)
-    shutil.copy2(source, target)
+    temp = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        shutil.copy2(source, temp)
+        temp.replace(target)
+    finally:
+        temp.unlink(missing_ok=True)
+
+
+def _kernel_copy(source_fd: int, target_fd: int, offset: int, count: int) -> None:
+    while count:
+        copied = os.copy_file_range(source_fd, target_fd, count, offset, offset)
+        if not copied:
+            raise OSError("copy_file_range hat keine Daten kopiert")
+        offset += copied
+        count -= copied
+
+
+def copy_file_hashed(source: Path, target: Path) -> tuple[int, str]:
+    """Kopiert wie `copy_file` und liefert dabei Groesse und SHA-256.
+
+    Jeder Block wird einmal gelesen und gehasht; geschrieben wird er per
+    `os.copy_file_range` im Kernel aus dem warmen Page-Cache (auf btrfs/XFS
+    als Reflink). Ohne Kernel-Unterstuetzung wird der gelesene Block direkt
+    geschrieben.
+    """
+    ensure_dir(target.parent)
+    temp = target.with_name(f".{target.name}.{uuid.uuid4().hex}.tmp")
+    digest = hashlib.sha256()
+    size = 0
+    kernel_copy = hasattr(os, "copy_file_range")
+    buffer = memoryview(bytearray(COPY_CHUNK_BYTES))
+    try:
+        with source.open("rb", buffering=0) as reader, temp.open("wb", buffering=0) as writer:
+            while True:
+                read = reader.readinto(buffer)
+                if not read:
+                    break
+                chunk = buffer[:read]
+                digest.update(chunk)
+                if kernel_copy:
+                    try:
+                        _kernel_copy(reader.fileno(), writer.fileno(), size, read)
+                    except OSError:
+                        kernel_copy = False
+                if not kernel_copy:
+                    os.pwrite(writer.fileno(), chunk, size)
+                size += read
+        shutil.copystat(source, temp)
+        temp.replace(target)
+    finally:
+        temp.unlink(missing_ok=True)
+    return size, digest.hexdigest()
+
+
+def natural_sort_key(name: str) -> tuple:
+    """Sortiert `frame_2` vor `frame_10`; Ziffernfolgen werden als Zahl verglichen."""
+    parts = _DIGITS_RE.split(name.lower())
+    return tuple(int(part) if index % 2 else part for index, part in enumerate(parts))
+
+
+def _scan_frame_names(frame_dir: Path) -> Iterator[str]:
+    with os.scandir(frame_dir) as entries:
+        for entry in entries:
+            if os.path.splitext(entry.name)[1].lower() in IMAGE_SUFFIXES and entry.is_file():
+                yield entry.name
+
+
+def iter_frame_files(frame_dir: Path) -> Iterator[Path]:
+    """Liefert Bilddateien in natuerlicher Reihenfolge.
+
+    Fuer die Sortierung werden nur die Dateinamen gehalten, `Path`-Objekte
+    entstehen erst beim Iterieren. `os.scandir` liefert den Dateityp meist ohne
+    zusaetzlichen `stat`-Aufruf.
+    """
+    for name in sorted(_scan_frame_names(frame_dir), key=natural_sort_key):
+        yield frame_dir / name
+
+
+def count_frame_files(frame_dir: Path) -> int:
+    return sum(1 for _ in _scan_frame_names(frame_dir))
 
 
 def list_frame_files(frame_dir: Path) -> list[Path]:
-    items = [
-        path for path in frame_dir.iterdir()
-        if path.is_file() and path.suffix.lower() in IMAGE_SUFFIXES
-    ]
-    return sorted(items, key=lambda item: item.name.lower())
+    return list(iter_frame_files(frame_dir))
 
 
 def relative_to(path: Path, root: Path) -> str:
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Iterator
+
+from auto_clip.config import AppConfig
+from auto_clip.fs_utils import atomic_write_json, ensure_dir, relative_to
+
+logger = logging.getLogger(__name__)
+
+JOB_LAYOUTS = ("flat", "sharded")
+
+# Eigener Namensraum fuer Shards unter `dist/jobs/`. Genau diese Job-ID lehnt
+# `models.JobRequest` ab, so kann kein flacher Job so heissen und kein
+# Shard-Ordner mit einer Job-ID wie `12` zusammenfallen.
+SHARD_NAMESPACE = "_shards"
+
+
+def shard_parts(job_id: str) -> tuple[str, str]:
+    """Zwei Verzeichnisebenen aus dem FNV-1a-Hash (32 Bit) der Job-ID.
+
+    FNV-1a ist absichtlich gewaehlt: `site/assets/app.js` rechnet denselben
+    Pfad ohne Krypto-API nach.
+    """
+    value = 0x811C9DC5
+    for byte in job_id.encode("utf-8"):
+        value = ((value ^ byte) * 0x01000193) & 0xFFFFFFFF
+    digest = f"{value:08x}"
+    return digest[:2], digest[2:4]
+
+
+def shard_prefix(job_id: str, layout: str) -> str:
+    """Relativer Ordner vor der Job-Datei: `""` (flach) oder `"ab/cd/"`."""
+    if layout == "flat":
+        return ""
+    if layout == "sharded":
+        first, second = shard_parts(job_id)
+        return f"{first}/{second}/"
+    raise ValueError(f"Unbekanntes Job-Layout: {layout}")
+
+
+def jobs_root(config: AppConfig) -> Path:
+    return config.paths.build_root / "jobs"
+
+
+def _job_prefix(job_id: str, layout: str) -> str:
+    """Relativer Ordner unter `dist/jobs/`: `""` (flach) oder `"_shards/ab/cd/"`."""
+    prefix = shard_prefix(job_id, layout)
+    return f"{SHARD_NAMESPACE}/{prefix}" if prefix else ""
+
+
+def _layout_dir(config: AppConfig, job_id: str, layout: str) -> Path:
+    return jobs_root(config) / f"{_job_prefix(job_id, layout)}{job_id}"
+
+
+def locate_job_dir(config: AppConfig, job_id: str) -> Path:
+    """Einziger Ort, an dem der Ordner eines Jobs bestimmt wird.
+
+    Neue Jobs landen im konfigurierten Layout. Solange eine Migration laeuft,
+    wird ein Job, der nur im anderen Layout existiert, dort gefunden.
+    """
+    layout = config.paths.job_layout
+    primary = _layout_dir(config, job_id, layout)
+    if primary.exists():
+        return primary
+    for other in JOB_LAYOUTS:
+        if other != layout:
+            candidate = _layout_dir(config, job_id, other)
+            if candidate.exists():
+                return candidate
+    return primary
+
+
+def public_path(kind: str, job_id: str, filename: str, layout: str) -> str:
+    """Pfad einer Job-Datei im Public-Bundle, z. B. `videos/ab/cd/10001.mp4`."""
+    return f"{kind}/{shard_prefix(job_id, layout)}{filename}"
+
+
+def _looks_like_job(path: Path) -> bool:
+    return (path / "request.json").exists() or (path / "metadata.json").exists()
+
+
+def iter_job_dirs(config: AppConfig) -> Iterator[Path]:
+    """Liefert alle Job-Ordner, egal ob flach oder in Shards abgelegt."""
+    root = jobs_root(config)
+    if not root.exists():
+        return
+    with os.scandir(root) as entries:
+        top = sorted(entry.name for entry in entries if entry.is_dir())
+    for name in top:
+        if name != SHARD_NAMESPACE:
+            yield root / name
+            continue
+        for first in sorted(child for child in (root / name).iterdir() if child.is_dir()):
+            for second in sorted(child for child in first.iterdir() if child.is_dir()):
+                yield from sorted(child for child in second.iterdir() if child.is_dir())
+
+
+def job_is_running(path: Path, *, max_age_seconds: float, now: float | None = None) -> bool:
+    """Ein Lauf schreibt `request.json` zuerst und `metadata.json` zuletzt.
+
+    Ist `request.json` aelter als `max_age_seconds`, gilt der Job nicht mehr
+    als laufend, sondern als abgebrochen: ein fehlgeschlagener Lauf hinterlaesst
+    dasselbe Muster wie ein laufender.
+    """
+    try:
+        request_mtime = (path / "request.json").stat().st_mtime
+    except FileNotFoundError:
+        return False
+    now = time.time() if now is None else now
+    if now - request_mtime >= max_age_seconds:
+        return False
+    try:
+        return request_mtime > (path / "metadata.json").stat().st_mtime
+    except FileNotFoundError:
+        return True
+
+
+def _rebase(value: object, old_prefix: str, new_prefix: str) -> object:
+    if isinstance(value, str) and value.startswith(old_prefix):
+        return new_prefix + value[len(old_prefix):]
+    if isinstance(value, dict):
+        return {key: _rebase(item, old_prefix, new_prefix) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_rebase(item, old_prefix, new_prefix) for item in value]
+    return value
+
+
+def _fix_metadata(config: AppConfig, path: Path) -> bool:
+    """Schreibt Artefaktpfade in `metadata.json` auf den aktuellen Ordner um."""
+    metadata_path = path / "metadata.json"
+    try:
+        metadata = json.loads(metadata_path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return False
+    new_prefix = relative_to(path, config.project_root) + "/"
+    changed = False
+    for layout in JOB_LAYOUTS:
+        old_prefix = relative_to(jobs_root(config), config.project_root) + "/" + _job_prefix(path.name, layout) + path.name + "/"
+        if old_prefix != new_prefix:
+            rebased = _rebase(metadata, old_prefix, new_prefix)
+            if rebased != metadata:
+                metadata = rebased
+                changed = True
+    if changed:
+        atomic_write_json(metadata_path, metadata)
+    return changed
+
+
+def _inside_job(config: AppConfig, target: Path) -> bool:
+    """Liegt `target` in einem bestehenden Job-Ordner? Dann darf dort kein Shard entstehen."""
+    root = jobs_root(config)
+    return any(_looks_like_job(parent) for parent in target.parents if parent != root and root in parent.parents)
+
+
+def migrate_jobs(config: AppConfig, *, dry_run: bool = False) -> dict:
+    """Verschiebt Jobs ins konfigurierte Layout, waehrend Watcher weiterlaufen.
+
+    Jeder Job wandert per Rename in einem Schritt; laufende Jobs werden
+    uebersprungen und beim naechsten Aufruf nachgeholt. Danach werden die
+    Pfade in `metadata.json` angepasst. Der Aufruf ist wiederholbar: er
+    repariert auch Jobs, deren Verschiebung vor dem Metadaten-Update abbrach.
+    """
+    layout = config.paths.job_layout
+    moved: list[str] = []
+    skipped: list[str] = []
+    repaired: list[str] = []
+    for path in list(iter_job_dirs(config)):
+        target = _layout_dir(config, path.name, layout)
+        if path == target:
+            if not dry_run and _fix_metadata(config, path):
+                repaired.append(path.name)
+            continue
+        if job_is_running(path, max_age_seconds=config.retention.min_age_seconds) or target.exists():
+            skipped.append(path.name)
+            continue
+        if _inside_job(config, target):
+            logger.warning("Ziel %s liegt in einem Job-Ordner, %s bleibt liegen", target, path.name)
+            skipped.append(path.name)
+            continue
+        moved.append(path.name)
+        if dry_run:
+            continue
+        ensure_dir(target.parent)
+        path.rename(target)
+        _fix_metadata(config, target)
+
+    logger.info("Migration nach '%s': %s verschoben, %s uebersprungen", layout, len(moved), len(skipped))
+    return {
+        "layout": layout,
+        "dry_run": dry_run,
+        "moved": moved,
+        "skipped": skipped,
+        "repaired": repaired,
+    }
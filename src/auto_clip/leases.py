@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from auto_clip.fs_utils import atomic_write_text
+
+logger = logging.getLogger(__name__)
+
+LEASE_SUFFIX = ".lease"
+ATTEMPTS_SUFFIX = ".attempts"
+
+
+@dataclass(frozen=True)
+class Lease:
+    manifest_name: str
+    token: str
+    owner_host: str
+    owner_pid: int
+    attempt: int
+    claimed_at: float
+    heartbeat_at: float
+    expires_at: float
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass(frozen=True)
+class ClaimedManifest:
+    manifest_path: Path
+    lease_path: Path
+    lease: Lease
+
+
+def lease_path_for(manifest_path: Path) -> Path:
+    return manifest_path.with_name(manifest_path.name + LEASE_SUFFIX)
+
+
+def _attempts_path_for(manifest_path: Path) -> Path:
+    return manifest_path.with_name(manifest_path.name + ATTEMPTS_SUFFIX)
+
+
+def _read_attempts(manifest_path: Path) -> int:
+    try:
+        return int(_attempts_path_for(manifest_path).read_text(encoding="utf-8").strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+
+def _read_lease(path: Path) -> Lease | None:
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+        return Lease(**payload)
+    except (FileNotFoundError, ValueError, TypeError):
+        return None
+
+
+def _serialize(lease: Lease) -> str:
+    return json.dumps(lease.to_dict(), indent=2) + "\n"
+
+
+def _owner_is_dead(lease: Lease) -> bool:
+    """Nur auf demselben Host laesst sich ein abgestuerzter Besitzer sicher erkennen."""
+    if lease.owner_host != socket.gethostname():
+        return False
+    try:
+        os.kill(lease.owner_pid, 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    return False
+
+
+def claim_manifest(source: Path, working_dir: Path, *, lease_seconds: int) -> ClaimedManifest | None:
+    """Uebernimmt ein Manifest aus dem Eingang exklusiv fuer diesen Prozess.
+
+    Zuerst wird die Lease-Datei mit O_EXCL angelegt, erst danach wird das
+    Manifest verschoben. Damit liegt in `working/` nie ein Manifest ohne Lease,
+    und konkurrierende Worker (auch auf anderen Hosts mit geteiltem
+    Verzeichnis) koennen dasselbe Manifest nicht doppelt uebernehmen.
+    Gibt `None` zurueck, wenn ein anderer Worker schneller war.
+    """
+    target = working_dir / source.name
+    lease_path = lease_path_for(target)
+    now = time.time()
+    lease = Lease(
+        manifest_name=source.name,
+        token=uuid.uuid4().hex,
+        owner_host=socket.gethostname(),
+        owner_pid=os.getpid(),
+        attempt=_read_attempts(target) + 1,
+        claimed_at=now,
+        heartbeat_at=now,
+        expires_at=now + lease_seconds,
+    )
+
+    try:
+        fd = os.open(lease_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+    except FileExistsError:
+        return None
+    with os.fdopen(fd, "w", encoding="utf-8") as handle:
+        handle.write(_serialize(lease))
+        handle.flush()
+        os.fsync(handle.fileno())
+
+    try:
+        source.replace(target)
+    except FileNotFoundError:
+        lease_path.unlink(missing_ok=True)
+        return None
+
+    atomic_write_text(_attempts_path_for(target), f"{lease.attempt}\n")
+    return ClaimedManifest(manifest_path=target, lease_path=lease_path, lease=lease)
+
+
+def _being_reaped(lease_path: Path) -> bool:
+    return any(lease_path.parent.glob(f"{lease_path.name}.reap-*"))
+
+
+def renew_lease(claimed: ClaimedManifest, *, lease_seconds: int) -> bool:
+    """Verlaengert die Lease, solange sie noch diesem Worker gehoert.
+
+    Zwischen Lesen und Rename kann ein Aufraeumer die Lease beansprucht und
+    das Manifest zurueckgelegt haben; der Rename haette sie dann neu angelegt.
+    Deshalb wird danach geprueft, ob das Manifest noch da ist und niemand
+    gerade aufraeumt, und eine so wiederbelebte Lease wieder entfernt.
+    """
+    current = _read_lease(claimed.lease_path)
+    if current is None or current.token != claimed.lease.token:
+        return False
+    now = time.time()
+    renewed = Lease(**{**current.to_dict(), "heartbeat_at": now, "expires_at": now + lease_seconds})
+    temp = claimed.lease_path.with_name(f"{claimed.lease_path.name}.{renewed.token}.tmp")
+    temp.write_text(_serialize(renewed), encoding="utf-8")
+    temp.replace(claimed.lease_path)
+    if claimed.manifest_path.exists() and not _being_reaped(claimed.lease_path):
+        return True
+    if owns_lease(claimed):
+        claimed.lease_path.unlink(missing_ok=True)
+    return False
+
+
+def owns_lease(claimed: ClaimedManifest) -> bool:
+    """Prueft, ob die Lease auf der Platte noch dieselbe ist, die dieser Worker angelegt hat."""
+    current = _read_lease(claimed.lease_path)
+    return current is not None and current.token == claimed.lease.token
+
+
+def release_lease(claimed: ClaimedManifest) -> None:
+    """Gibt die Lease frei, nachdem das Manifest archiviert wurde."""
+    if not owns_lease(claimed):
+        return
+    _attempts_path_for(claimed.manifest_path).unlink(missing_ok=True)
+    claimed.lease_path.unlink(missing_ok=True)
+
+
+class LeaseHeartbeat:
+    """Erneuert eine Lease im Hintergrund, waehrend ein Job laeuft."""
+
+    def __init__(self, claimed: ClaimedManifest, *, lease_seconds: int, heartbeat_seconds: int) -> None:
+        self.claimed = claimed
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"lease-{claimed.lease.manifest_name}", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.heartbeat_seconds):
+            if not renew_lease(self.claimed, lease_seconds=self.lease_seconds):
+                self.lost = True
+                logger.warning("Lease verloren: %s", self.claimed.lease.manifest_name)
+                return
+
+    def __enter__(self) -> "LeaseHeartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *_exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+def _requeue(manifest: Path, inbox_dir: Path, failed_dir: Path, *, max_attempts: int, reason: str) -> dict | None:
+    attempts = _read_attempts(manifest)
+    exhausted = attempts >= max_attempts
+    target_dir = failed_dir if exhausted else inbox_dir
+    try:
+        manifest.replace(target_dir / manifest.name)
+    except FileNotFoundError:
+        return None
+
+    if exhausted:
+        note = failed_dir / f"{Path(manifest.name).stem}.error.txt"
+        note.write_text(f"{reason}; Versuche aufgebraucht ({attempts}/{max_attempts})\n", encoding="utf-8")
+        _attempts_path_for(manifest).unlink(missing_ok=True)
+
+    return {
+        "manifest": manifest.name,
+        "attempts": attempts,
+        "target": "failed" if exhausted else "inbox",
+        "reason": reason,
+    }
+
+
+def _restore_lease(stolen: Path, lease_path: Path) -> None:
+    """Legt eine irrtuemlich beanspruchte Lease zurueck, ohne eine neuere zu ueberschreiben."""
+    try:
+        os.link(stolen, lease_path)
+    except FileExistsError:
+        logger.warning("Lease %s inzwischen neu angelegt, beanspruchte Kopie verworfen", lease_path.name)
+    stolen.unlink(missing_ok=True)
+
+
+def reclaim_expired_leases(
+    working_dir: Path,
+    inbox_dir: Path,
+    failed_dir: Path,
+    *,
+    lease_seconds: int,
+    max_attempts: int,
+    now: float | None = None,
+) -> list[dict]:
+    """Holt Manifeste abgelaufener oder verwaister Leases zurueck.
+
+    Solange Versuche uebrig sind, wandert das Manifest zurueck in den Eingang,
+    sonst nach `failed/`. Mehrere Worker duerfen gleichzeitig aufraeumen: die
+    Lease wird per Rename beansprucht, nur genau ein Worker gewinnt. Danach
+    wird der beanspruchte Inhalt erneut gelesen; ist es nicht mehr die als
+    abgelaufen beurteilte Lease, kommt sie unveraendert zurueck.
+    """
+    now = time.time() if now is None else now
+    reclaimed: list[dict] = []
+
+    for lease_path in sorted(working_dir.glob(f"*{LEASE_SUFFIX}")):
+        lease = _read_lease(lease_path)
+        if lease is None:
+            try:
+                expires_at = lease_path.stat().st_mtime + lease_seconds
+            except FileNotFoundError:
+                continue
+            reason = "Lease unlesbar"
+        else:
+            expires_at = lease.expires_at
+            reason = f"Lease von {lease.owner_host}:{lease.owner_pid} abgelaufen"
+            if expires_at > now and _owner_is_dead(lease):
+                expires_at = now
+                reason = f"Besitzer {lease.owner_host}:{lease.owner_pid} nicht mehr aktiv"
+        if expires_at > now:
+            continue
+
+        stolen = lease_path.with_name(f"{lease_path.name}.reap-{uuid.uuid4().hex}")
+        try:
+            lease_path.replace(stolen)
+        except FileNotFoundError:
+            continue
+        if _read_lease(stolen) != lease:
+            # Zwischen Lesen und Rename wurde die Lease erneuert oder neu vergeben.
+            _restore_lease(stolen, lease_path)
+            continue
+
+        manifest = lease_path.with_name(lease_path.name[: -len(LEASE_SUFFIX)])
+        result = _requeue(manifest, inbox_dir, failed_dir, max_attempts=max_attempts, reason=reason)
+        stolen.unlink(missing_ok=True)
+        if result:
+            logger.warning("Manifest zurueckgeholt: %s -> %s (%s)", result["manifest"], result["target"], reason)
+            reclaimed.append(result)
+
+    for manifest in sorted(working_dir.glob("*.json")):
+        if lease_path_for(manifest).exists():
+            continue
+        try:
+            age = now - manifest.stat().st_mtime
+        except FileNotFoundError:
+            continue
+        if age < lease_seconds:
+            continue
+        result = _requeue(manifest, inbox_dir, failed_dir, max_attempts=max_attempts, reason="Manifest ohne Lease")
+        if result:
+            logger.warning("Verwaistes Manifest zurueckgeholt: %s -> %s", result["manifest"], result["target"])
+            reclaimed.append(result)
+
+    return reclaimed
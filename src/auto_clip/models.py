@@ -6,8 +6,11 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+from auto_clip.layout import SHARD_NAMESPACE
+
 
 JOB_ID_RE = re.compile(r"^[A-Za-z0-9_-]+$")
+RENDER_PROFILES = ("full", "preview")
 
 
 @dataclass(frozen=True)
@@ -34,12 +37,15 @@ class JobRequest:
     job_id: str
     source: SourceData
     vehicle: VehicleData
+    render_profile: str = "full"
 
     @classmethod
     def from_dict(cls, payload: dict[str, Any]) -> "JobRequest":
         job_id = str(payload.get("job_id", "")).strip()
         if not job_id or not JOB_ID_RE.match(job_id):
             raise ValueError("job_id fehlt oder ist ungueltig")
+        if job_id == SHARD_NAMESPACE:
+            raise ValueError(f"job_id '{SHARD_NAMESPACE}' ist fuer das Job-Layout reserviert")
 
         source_payload = payload.get("source") or {}
         vehicle_payload = payload.get("vehicle") or {}
@@ -67,6 +73,10 @@ class JobRequest:
         if missing:
             raise ValueError(f"vehicle-Felder fehlen: {', '.join(missing)}")
 
+        render_profile = str(payload.get("render_profile") or "full").strip()
+        if render_profile not in RENDER_PROFILES:
+            raise ValueError(f"render_profile ungueltig: {render_profile}")
+
         return cls(
             job_id=job_id,
             source=SourceData(
@@ -84,6 +94,7 @@ class JobRequest:
                 transmission=str(vehicle_payload["transmission"]).strip(),
                 listing_url=str(vehicle_payload["listing_url"]).strip(),
             ),
+            render_profile=render_profile,
         )
 
     def resolved_frame_dir(self, project_root: Path) -> Path:
@@ -2,45 +2,135 @@ from __future__ import annotations
 
 import json
 import logging
+from dataclasses import replace
 from pathlib import Path
 
 from auto_clip.config import AppConfig
-from auto_clip.fs_utils import atomic_write_json, atomic_write_text, ensure_dir, list_frame_files, relative_to
+from auto_clip.fs_utils import (
+    atomic_write_json,
+    atomic_write_text,
+    count_frame_files,
+    ensure_dir,
+    iter_frame_files,
+    relative_to,
+)
+from auto_clip.layout import locate_job_dir
 from auto_clip.models import JobRequest, utc_now_iso
 from auto_clip.publish import build_public_bundle
 from auto_clip.qa import audit_job_directory, audit_public_bundle
 from auto_clip.steps.ingest import load_job_request
-from auto_clip.steps.render import render_video
+from auto_clip.steps.render import (
+    remux_audio,
+    render_config_for_profile,
+    render_video,
+    video_fingerprint,
+    video_only_path,
+)
 from auto_clip.steps.script_text import build_content
 from auto_clip.steps.voice import prepare_audio
+from auto_clip.text_templates import load_template_set
+from auto_clip.tts import SpeechSynthesizer, build_synthesizer
 
 logger = logging.getLogger(__name__)
 
 
-def _job_dir(config: AppConfig, job_id: str) -> Path:
-    return config.paths.build_root / "jobs" / job_id
+def _load_previous_metadata(job_dir: Path) -> dict | None:
+    path = job_dir / "metadata.json"
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except ValueError:
+        return None
+
+
+def _reusable_video(previous: dict | None, fingerprint: str, config: AppConfig) -> dict | None:
+    """Liefert die vorige Render-Ausgabe, wenn sich nur der Ton geaendert haben kann."""
+    if not previous or previous.get("render", {}).get("video_fingerprint") != fingerprint:
+        return None
+    artifacts = previous.get("artifacts", {})
+    video = config.project_root / artifacts.get("video_path", "")
+    poster = config.project_root / artifacts.get("poster_path", "")
+    if not artifacts.get("video_path") or not video.is_file() or not poster.is_file():
+        return None
+    if not video_only_path(video).is_file():
+        return None
+    return {
+        "video_file": video,
+        "poster_file": poster,
+        "staged_frame_count": previous["render"].get("staged_frame_count", 0),
+    }
 
 
-def process_manifest(manifest_path: Path, config: AppConfig) -> dict:
-    logger.info("Starte Lauf fuer Manifest %s", manifest_path)
-    request = load_job_request(manifest_path)
-    return process_request(request, manifest_path, config)
+def _queue_full_render(request: JobRequest, config: AppConfig) -> Path:
+    """Legt den Vollrender nach einer Vorschau als eigenes Manifest in den Eingang."""
+    payload = replace(request, render_profile="full").to_dict()
+    target = config.paths.jobs_inbox / f"{request.job_id}.full.json"
+    atomic_write_json(target, payload)
+    return target
 
 
-def process_request(request: JobRequest, manifest_path: Path, config: AppConfig) -> dict:
-    job_dir = _job_dir(config, request.job_id)
+def process_manifest(
+    manifest_path: Path,
+    config: AppConfig,
+    synthesizer: SpeechSynthesizer | None = None,
+    render_profile: str | None = None,
+) -> dict:
+    logger.info("Starte Lauf fuer Manifest %s", manifest_path)
+    request = load_job_request(manifest_path)
+    if render_profile:
+        request = replace(request, render_profile=render_profile)
+    if synthesizer is not None:
+        return process_request(request, manifest_path, config, synthesizer)
+
+    synthesizer = build_synthesizer(config)
+    try:
+        return process_request(request, manifest_path, config, synthesizer)
+    finally:
+        if synthesizer is not None:
+            synthesizer.close()
+
+
+def prefetch_narrations(manifests: list[Path], config: AppConfig, synthesizer: SpeechSynthesizer) -> int:
+    """Stoesst die Sprachsynthese fuer wartende Manifeste vorab im Hintergrund an.
+
+    So ueberlappt die TTS-Latenz mit den Renderlaeufen anderer Jobs. Fehlerhafte
+    Manifeste werden hier uebersprungen und spaeter regulaer als Fehler gemeldet.
+    """
+    templates = load_template_set(config.content.template_dir, config.content.locale)
+    submitted = 0
+    for manifest_path in manifests:
+        try:
+            request = load_job_request(manifest_path)
+        except (OSError, ValueError):
+            continue
+        if request.resolved_voice_wav(config.project_root):
+            continue
+        synthesizer.submit(build_content(request, templates)["narration"])
+        submitted += 1
+    return submitted
+
+
+def process_request(
+    request: JobRequest,
+    manifest_path: Path,
+    config: AppConfig,
+    synthesizer: SpeechSynthesizer | None = None,
+) -> dict:
+    job_dir = locate_job_dir(config, request.job_id)
     ensure_dir(job_dir)
+    previous = _load_previous_metadata(job_dir)
     atomic_write_json(job_dir / "request.json", request.to_dict())
 
     frame_dir = request.resolved_frame_dir(config.project_root)
     if not frame_dir.exists():
         raise FileNotFoundError(f"Frame-Ordner nicht gefunden: {frame_dir}")
 
-    frame_files = list_frame_files(frame_dir)
-    if not frame_files:
+    frame_count = count_frame_files(frame_dir)
+    if not frame_count:
         raise FileNotFoundError(f"Keine Bilddateien im Frame-Ordner gefunden: {frame_dir}")
 
-    content = build_content(request)
+    content = build_content(request, load_template_set(config.content.template_dir, config.content.locale))
     content_dir = job_dir / "content"
     audio_dir = job_dir / "audio"
     video_dir = job_dir / "video"
@@ -58,16 +148,32 @@ def process_request(request: JobRequest, manifest_path: Path, config: AppConfig)
         source_wav=source_wav,
         target_wav=audio_file,
         narration_text=content["narration"],
+        synthesizer=synthesizer,
     )
     atomic_write_json(audio_dir / "voice.json", voice_report)
 
-    render_result = render_video(
-        config=config,
-        frame_files=frame_files,
-        audio_file=audio_file,
-        job_video_dir=video_dir,
-        job_id=request.job_id,
-    )
+    preview = request.render_profile == "preview"
+    render_config = render_config_for_profile(config, request.render_profile)
+    fingerprint = video_fingerprint(render_config, iter_frame_files(frame_dir))
+    reusable = _reusable_video(previous, fingerprint, config)
+    if reusable:
+        logger.info("Nur der Ton hat sich geaendert, Remux fuer %s", request.job_id)
+        render_result = remux_audio(
+            config=render_config,
+            audio_file=audio_file,
+            video_file=reusable["video_file"],
+            poster_file=reusable["poster_file"],
+            staged_frame_count=reusable["staged_frame_count"],
+        )
+    else:
+        render_result = render_video(
+            config=render_config,
+            frame_files=iter_frame_files(frame_dir),
+            audio_file=audio_file,
+            job_video_dir=video_dir,
+            job_id=request.job_id,
+            output_name=f"{request.job_id}.preview.mp4" if preview else None,
+        )
 
     metadata = {
         "schema_version": "v2",
@@ -83,11 +189,14 @@ def process_request(request: JobRequest, manifest_path: Path, config: AppConfig)
             "poster_path": relative_to(render_result["poster_file"], config.project_root),
         },
         "render": {
-            "frame_count": len(frame_files),
+            "profile": request.render_profile,
+            "mode": render_result["mode"],
+            "frame_count": frame_count,
             "staged_frame_count": render_result["staged_frame_count"],
-            "frame_rate": config.render.frame_rate,
-            "width": config.render.width,
-            "height": config.render.height,
+            "frame_rate": render_config.render.frame_rate,
+            "width": render_config.render.width,
+            "height": render_config.render.height,
+            "video_fingerprint": fingerprint,
         },
         "provenance": {
             "generator": "auto-clip",
@@ -96,6 +205,8 @@ def process_request(request: JobRequest, manifest_path: Path, config: AppConfig)
         },
         "qa": {},
     }
+    if "segments" in render_result:
+        metadata["render"]["segments"] = render_result["segments"]
 
     atomic_write_json(job_dir / "metadata.json", metadata)
 
@@ -114,5 +225,15 @@ def process_request(request: JobRequest, manifest_path: Path, config: AppConfig)
     if not public_audit["ok"]:
         raise RuntimeError(f"Public-QA fehlgeschlagen: {json.dumps(public_audit, ensure_ascii=False)}")
 
+    if preview:
+        queued = _queue_full_render(request, config)
+        metadata["render"]["full_render_manifest"] = relative_to(queued, config.project_root)
+        atomic_write_json(job_dir / "metadata.json", metadata)
+        logger.info("Vorschau fuer %s veroeffentlicht, Vollrender eingereiht: %s", request.job_id, queued.name)
+    else:
+        preview_video = video_dir / f"{request.job_id}.preview.mp4"
+        preview_video.unlink(missing_ok=True)
+        video_only_path(preview_video).unlink(missing_ok=True)
+
     logger.info("Lauf fuer %s erfolgreich abgeschlossen", request.job_id)
     return metadata
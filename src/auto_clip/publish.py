@@ -1,11 +1,20 @@
 from __future__ import annotations
 
+import fcntl
 import json
+import os
 import shutil
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 
+from auto_clip.blobs import BlobStore, blob_store_for
 from auto_clip.config import AppConfig
-from auto_clip.fs_utils import atomic_write_json, copy_file, ensure_dir
+from auto_clip.facets import build_facet_index
+from auto_clip.fs_utils import atomic_write_json, copy_file_hashed, ensure_dir
+from auto_clip.layout import iter_job_dirs, public_path
 
 
 def _load_job_metadata(job_root: Path) -> dict | None:
@@ -15,13 +24,9 @@ def _load_job_metadata(job_root: Path) -> dict | None:
     return json.loads(path.read_text(encoding="utf-8"))
 
 
-def _iter_jobs(build_jobs_root: Path) -> list[dict]:
+def _iter_jobs(config: AppConfig) -> list[dict]:
     jobs: list[dict] = []
-    if not build_jobs_root.exists():
-        return jobs
-    for job_root in sorted(build_jobs_root.iterdir()):
-        if not job_root.is_dir():
-            continue
+    for job_root in iter_job_dirs(config):
         metadata = _load_job_metadata(job_root)
         if metadata:
             jobs.append(metadata)
@@ -29,47 +34,165 @@ def _iter_jobs(build_jobs_root: Path) -> list[dict]:
     return jobs
 
 
+def _place_asset(store: BlobStore | None, source: Path, target: Path) -> dict:
+    """Verlinkt ein Job-Artefakt ueber den Blob-Store ins Bundle, ohne Store wird kopiert.
+
+    Gibt Groesse und SHA-256 zurueck; beides faellt beim Ablegen ohnehin an.
+    """
+    if store is None:
+        size, digest = copy_file_hashed(source, target)
+    else:
+        digest = store.put(source, adopt=True)
+        store.link(digest, target)
+        size = target.stat().st_size
+    return {"size": size, "sha256": digest}
+
+
+def _place_assets(store: BlobStore | None, placements: list[tuple[Path, Path]], workers: int) -> list[dict]:
+    """Legt alle Assets ueber einen begrenzten Thread-Pool ab; Hashing und Kopie laufen ohne GIL."""
+    if workers <= 1 or len(placements) <= 1:
+        return [_place_asset(store, source, target) for source, target in placements]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="publish") as pool:
+        return list(pool.map(lambda item: _place_asset(store, *item), placements))
+
+
+PUBLIC_BUILD_STALE_SECONDS = 24 * 3600
+PUBLIC_LOCK_NAME = ".lock"
+
+
+def _builds_root(public_root: Path) -> Path:
+    return public_root.with_name(f"{public_root.name}-builds")
+
+
+def _link_target(public_root: Path) -> str | None:
+    try:
+        return Path(os.readlink(public_root)).name
+    except (FileNotFoundError, OSError):
+        return None
+
+
+def _activate_build(build_dir: Path, public_root: Path) -> str | None:
+    """Laesst `public_root` per `os.replace` eines Symlinks auf `build_dir` zeigen.
+
+    Das Ersetzen des Links ist atomar: `dist/public` existiert zu jedem
+    Zeitpunkt und zeigt auf einen vollstaendigen Build. Gibt den Namen des
+    vorherigen Builds zurueck.
+    """
+    previous = _link_target(public_root) if public_root.is_symlink() else None
+    if public_root.exists() and not public_root.is_symlink():
+        # Bundle aus der Zeit vor den versionierten Builds: einmalig einsortieren.
+        legacy = build_dir.with_name(f"legacy-{uuid.uuid4().hex}")
+        public_root.replace(legacy)
+        previous = legacy.name
+    link = public_root.with_name(f".{public_root.name}.{uuid.uuid4().hex}.lnk")
+    os.symlink(os.path.relpath(build_dir, public_root.parent), link)
+    try:
+        os.replace(link, public_root)
+    except BaseException:
+        link.unlink(missing_ok=True)
+        raise
+    return previous
+
+
+@contextmanager
+def _publish_lock(builds_root: Path):
+    """Serialisiert Umschalten und Aufraeumen paralleler Publish-Laeufe.
+
+    Ohne Sperre koennte ein Lauf den Build loeschen, den ein anderer gerade
+    aktiviert hat, und `dist/public` zeigte ins Leere.
+    """
+    with (builds_root / PUBLIC_LOCK_NAME).open("a") as handle:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+def _prune_builds(builds_root: Path, keep: set[str], now: float) -> None:
+    """Entfernt alte Builds; der aktuelle und der vorige bleiben fuer laufende Anfragen liegen."""
+    for path in builds_root.iterdir():
+        if path.name in keep or not path.is_dir():
+            continue
+        if path.name.endswith(".tmp"):
+            # Gerade laufender Build eines anderen Prozesses oder Ueberrest eines Absturzes.
+            if now - path.stat().st_mtime < PUBLIC_BUILD_STALE_SECONDS:
+                continue
+        shutil.rmtree(path, ignore_errors=True)
+
+
 def build_public_bundle(config: AppConfig) -> dict:
-    jobs_root = config.paths.build_root / "jobs"
     public_root = config.paths.build_root / "public"
+    builds_root = _builds_root(public_root)
+    ensure_dir(builds_root)
+    build_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    staging_root = builds_root / f"{build_id}.tmp"
+    try:
+        job_count = _populate_bundle(config, staging_root)
+    except BaseException:
+        shutil.rmtree(staging_root, ignore_errors=True)
+        raise
+    with _publish_lock(builds_root):
+        # Erst unter der Sperre umbenennen: ein fertiger, noch nicht aktiver
+        # Build ohne `.tmp` waere fuer parallele Laeufe Abfall.
+        build_dir = staging_root.replace(builds_root / build_id)
+        previous = _activate_build(build_dir, public_root)
+        _prune_builds(builds_root, {build_id, previous or ""}, time.time())
+
+    return {
+        "public_root": public_root,
+        "job_count": job_count,
+    }
+
 
-    if public_root.exists():
-        shutil.rmtree(public_root)
-    shutil.copytree(config.paths.site_root, public_root)
+def _populate_bundle(config: AppConfig, staging_root: Path) -> int:
+    layout = config.paths.job_layout
+    shutil.copytree(config.paths.site_root, staging_root)
 
-    data_root = public_root / "data"
-    video_root = public_root / "videos"
-    poster_root = public_root / "posters"
+    data_root = staging_root / "data"
+    video_root = staging_root / "videos"
+    poster_root = staging_root / "posters"
     ensure_dir(data_root)
     ensure_dir(video_root)
     ensure_dir(poster_root)
 
-    asset_manifest = {"videos": {}, "posters": {}, "data": {}}
+    store = blob_store_for(config)
+    asset_manifest = {"videos": {}, "posters": {}, "data": {}, "files": {}}
     catalog_items: list[dict] = []
 
-    for metadata in _iter_jobs(jobs_root):
+    jobs = _iter_jobs(config)
+    placements: list[tuple[Path, Path]] = []
+    for metadata in jobs:
         job_id = metadata["job_id"]
         source_video = config.project_root / metadata["artifacts"]["video_path"]
         source_poster = config.project_root / metadata["artifacts"]["poster_path"]
+        placements.append((source_video, staging_root / public_path("videos", job_id, f"{job_id}.mp4", layout)))
+        placements.append((source_poster, staging_root / public_path("posters", job_id, f"{job_id}{source_poster.suffix}", layout)))
 
-        target_video = video_root / f"{job_id}.mp4"
-        target_poster = poster_root / source_poster.name
-        copy_file(source_video, target_video)
-        copy_file(source_poster, target_poster)
+    checksums = _place_assets(store, placements, config.publish.copy_workers)
+    for (_source, target), checksum in zip(placements, checksums):
+        asset_manifest["files"][target.relative_to(staging_root).as_posix()] = checksum
+
+    for metadata in jobs:
+        job_id = metadata["job_id"]
+        poster_suffix = Path(metadata["artifacts"]["poster_path"]).suffix
+        video_url = "./" + public_path("videos", job_id, f"{job_id}.mp4", layout)
+        poster_url = "./" + public_path("posters", job_id, f"{job_id}{poster_suffix}", layout)
+        data_file = public_path("data", job_id, f"{job_id}.json", layout)
 
         public_payload = dict(metadata)
         public_payload["public"] = {
             "page_url": f"{config.base_url}/?job={job_id}",
-            "video_url": f"./videos/{job_id}.mp4",
-            "poster_url": f"./posters/{target_poster.name}",
-            "metadata_url": f"./data/{job_id}.json",
+            "video_url": video_url,
+            "poster_url": poster_url,
+            "metadata_url": f"./{data_file}",
         }
 
-        atomic_write_json(data_root / f"{job_id}.json", public_payload)
+        atomic_write_json(staging_root / data_file, public_payload)
 
-        asset_manifest["videos"][job_id] = f"./videos/{job_id}.mp4"
-        asset_manifest["posters"][job_id] = f"./posters/{target_poster.name}"
-        asset_manifest["data"][job_id] = f"./data/{job_id}.json"
+        asset_manifest["videos"][job_id] = video_url
+        asset_manifest["posters"][job_id] = poster_url
+        asset_manifest["data"][job_id] = f"./{data_file}"
 
         catalog_items.append({
             "job_id": job_id,
@@ -79,13 +202,15 @@ def build_public_bundle(config: AppConfig) -> dict:
         })
 
     atomic_write_json(data_root / "catalog.json", {"items": catalog_items})
+    index_files = build_facet_index(catalog_items)
+    index_files["meta.json"]["layout"] = layout
+    for name, payload in index_files.items():
+        atomic_write_json(data_root / "index" / name, payload, compact=True)
     atomic_write_json(data_root / "asset-manifest.json", asset_manifest)
     atomic_write_json(data_root / "build.json", {
         "job_count": len(catalog_items),
+        "layout": layout,
         "base_url": config.base_url,
+        "index_url": "./data/index/meta.json",
     })
-
-    return {
-        "public_root": public_root,
-        "job_count": len(catalog_items),
-    }
+    return len(catalog_items)
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import hashlib
+import json
 from pathlib import Path
 
 
@@ -15,6 +17,7 @@ REQUIRED_PUBLIC_FILES = [
     "data/catalog.json",
     "data/asset-manifest.json",
     "data/build.json",
+    "data/index/meta.json",
 ]
 
 
@@ -38,19 +41,55 @@ def audit_job_directory(job_dir: Path) -> dict:
     }
 
 
-def audit_public_bundle(public_root: Path, job_id: str | None = None) -> dict:
+def _sha256(path: Path) -> str:
+    with path.open("rb") as handle:
+        return hashlib.file_digest(handle, "sha256").hexdigest()
+
+
+def _load_asset_manifest(public_root: Path) -> dict:
+    try:
+        return json.loads((public_root / "data" / "asset-manifest.json").read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def audit_public_bundle(public_root: Path, job_id: str | None = None, *, verify_checksums: bool = False) -> dict:
+    """Prueft Pflichtdateien und die Eintraege aus `asset-manifest.json`.
+
+    Groessen werden immer per `stat` verglichen; `verify_checksums` liest die
+    Dateien zusaetzlich und vergleicht den SHA-256. Mit `job_id` werden nur
+    die Assets dieses Jobs geprueft; ihre Pfade stammen aus dem Manifest und
+    haengen damit nicht vom Job-Layout ab.
+    """
     missing = []
+    mismatched = []
     for relative in REQUIRED_PUBLIC_FILES:
         if not (public_root / relative).exists():
             missing.append(relative)
 
+    assets = _load_asset_manifest(public_root)
+    checksums = assets.get("files", {})
     if job_id:
-        if not (public_root / "data" / f"{job_id}.json").exists():
-            missing.append(f"data/{job_id}.json")
-        if not (public_root / "videos" / f"{job_id}.mp4").exists():
-            missing.append(f"videos/{job_id}.mp4")
+        data = assets.get("data", {}).get(job_id, f"./data/{job_id}.json").removeprefix("./")
+        video = assets.get("videos", {}).get(job_id, f"./videos/{job_id}.mp4").removeprefix("./")
+        for relative in [data, video]:
+            if not (public_root / relative).exists():
+                missing.append(relative)
+        wanted = {video, assets.get("posters", {}).get(job_id, "").removeprefix("./")}
+        checksums = {key: value for key, value in checksums.items() if key in wanted}
+    for relative, expected in sorted(checksums.items()):
+        path = public_root / relative
+        try:
+            size = path.stat().st_size
+        except FileNotFoundError:
+            if relative not in missing:
+                missing.append(relative)
+            continue
+        if size != expected["size"] or (verify_checksums and _sha256(path) != expected["sha256"]):
+            mismatched.append(relative)
 
     return {
-        "ok": not missing,
+        "ok": not missing and not mismatched,
         "missing": missing,
+        "mismatched": mismatched,
     }
@@ -0,0 +1,196 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import time
+from pathlib import Path
+
+from auto_clip.blobs import blob_store_for
+from auto_clip.config import AppConfig
+from auto_clip.layout import iter_job_dirs, job_is_running
+
+logger = logging.getLogger(__name__)
+
+STAGING_INTERMEDIATES = ["video/staged_frames", "video/frames.txt", "video/segments"]
+
+
+def _own_size(stat: os.stat_result) -> int:
+    # Hardlinks in den Blob-Store belegen erst Platz, wenn der Blob selbst geht.
+    return stat.st_size if stat.st_nlink <= 1 else 0
+
+
+def path_size(path: Path) -> int:
+    """Belegter Platz, den ein Loeschen von `path` sofort freigibt."""
+    if path.is_symlink() or path.is_file():
+        return _own_size(path.lstat())
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += _own_size(os.lstat(os.path.join(root, name)))
+            except FileNotFoundError:
+                continue
+    return total
+
+
+def load_active_ids(path: Path) -> set[str]:
+    """Liest die aktiven Job-IDs aus einer JSON-Liste oder einer Textdatei mit einer ID pro Zeile."""
+    text = path.read_text(encoding="utf-8")
+    if text.lstrip().startswith("["):
+        return {str(item).strip() for item in json.loads(text)}
+    return {line.strip() for line in text.splitlines() if line.strip() and not line.startswith("#")}
+
+
+def published_job_ids(public_root: Path) -> set[str]:
+    manifest = public_root / "data" / "asset-manifest.json"
+    if not manifest.exists():
+        return set()
+    payload = json.loads(manifest.read_text(encoding="utf-8"))
+    return set(payload.get("videos", {})) | set(payload.get("data", {}))
+
+
+def _load_metadata(job_dir: Path) -> dict | None:
+    try:
+        return json.loads((job_dir / "metadata.json").read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+class _Collector:
+    def __init__(self, dry_run: bool) -> None:
+        self.dry_run = dry_run
+        self.removed: dict[str, list[str]] = {}
+        self.bytes_by_reason: dict[str, int] = {}
+
+    def remove(self, path: Path, reason: str) -> int:
+        if not path.exists() and not path.is_symlink():
+            return 0
+        size = path_size(path)
+        if not self.dry_run:
+            if path.is_dir() and not path.is_symlink():
+                shutil.rmtree(path)
+            else:
+                path.unlink()
+        self.removed.setdefault(reason, []).append(path.as_posix())
+        self.bytes_by_reason[reason] = self.bytes_by_reason.get(reason, 0) + size
+        return size
+
+    def report(self, protected: set[str]) -> dict:
+        return {
+            "dry_run": self.dry_run,
+            "bytes_reclaimed": sum(self.bytes_by_reason.values()),
+            "bytes_by_reason": self.bytes_by_reason,
+            "removed": self.removed,
+            "protected_job_ids": sorted(protected),
+        }
+
+
+def collect_garbage(
+    config: AppConfig,
+    *,
+    active_ids: set[str] | None = None,
+    dry_run: bool = False,
+    force: bool = False,
+    now: float | None = None,
+) -> dict:
+    """Raeumt `dist/` und `jobs/failed/` nach den Regeln aus `config.retention` auf.
+
+    Reihenfolge: fehlgeschlagene Manifeste ueber `keep_failed`, Jobs ausserhalb
+    der aktiven Upstream-IDs und unvollstaendige Jobs, Zwischenstaende
+    erfolgreich gepruefter Jobs, danach die Groessengrenzen fuer Caches und
+    Jobs (aelteste zuerst). Zuletzt fallen Blobs weg, auf die kein Job und
+    kein Bundle mehr verlinkt; im Probelauf zaehlen nur die schon jetzt
+    unbenutzten.
+
+    Jobs, die das aktuelle Public-Bundle referenziert, entfernt keine Regel;
+    fehlen sie in der Upstream-Liste, verschwinden sie mit dem naechsten
+    Publish aus dem Bundle und beim folgenden GC von der Platte. Dateien unter
+    `dist/public/` und `dist/public-builds/` fasst der GC nie an; alte Builds
+    raeumt `build_public_bundle` selbst weg. Eine leere Upstream-Liste (etwa eine
+    abgeschnittene Datei) wird ohne `force` abgelehnt.
+    """
+    if active_ids is not None and not active_ids and not force:
+        raise ValueError("Liste aktiver Job-IDs ist leer; GC abgebrochen (mit force trotzdem ausfuehren)")
+    retention = config.retention
+    now = time.time() if now is None else now
+    public_root = config.paths.build_root / "public"
+    protected = published_job_ids(public_root)
+    collector = _Collector(dry_run)
+
+    settled = [
+        path for path in iter_job_dirs(config)
+        if not job_is_running(path, max_age_seconds=retention.min_age_seconds, now=now)
+    ]
+
+    failed_manifests = sorted(
+        config.paths.jobs_failed.glob("*.json"),
+        key=lambda path: path.stat().st_mtime,
+        reverse=True,
+    ) if config.paths.jobs_failed.exists() else []
+    for manifest in failed_manifests[retention.keep_failed:]:
+        collector.remove(manifest, "failed")
+        collector.remove(manifest.with_name(f"{manifest.stem}.error.txt"), "failed")
+
+    remaining: list[Path] = []
+    for job_dir in settled:
+        metadata = _load_metadata(job_dir)
+        age = now - job_dir.stat().st_mtime
+        published = job_dir.name in protected
+        if active_ids is not None and job_dir.name not in active_ids and not published:
+            collector.remove(job_dir, "expired")
+        elif metadata is None and not published and age >= retention.min_age_seconds:
+            collector.remove(job_dir, "incomplete")
+        else:
+            remaining.append(job_dir)
+            if metadata and metadata.get("qa", {}).get("local", {}).get("ok"):
+                for relative in STAGING_INTERMEDIATES:
+                    collector.remove(job_dir / relative, "staging")
+
+    if retention.max_cache_bytes is not None:
+        _enforce_cache_cap(config.paths.build_root / "cache", retention.max_cache_bytes, collector)
+
+    if retention.max_job_bytes is not None:
+        sizes = {job_dir: path_size(job_dir) for job_dir in remaining}
+        total = sum(sizes.values())
+        for job_dir in sorted(remaining, key=lambda path: path.stat().st_mtime):
+            if total <= retention.max_job_bytes:
+                break
+            if job_dir.name in protected:
+                continue
+            total -= collector.remove(job_dir, "size_cap")
+
+    _collect_blobs(config, retention.min_age_seconds, now, collector)
+
+    report = collector.report(protected)
+    logger.info("GC: %s Bytes freigegeben%s", report["bytes_reclaimed"], " (Probelauf)" if dry_run else "")
+    return report
+
+
+def _enforce_cache_cap(cache_root: Path, max_bytes: int, collector: _Collector) -> None:
+    if not cache_root.exists():
+        return
+    entries: list[tuple[float, int, Path]] = []
+    for root, _dirs, files in os.walk(cache_root):
+        for name in files:
+            path = Path(root) / name
+            stat = path.stat()
+            entries.append((max(stat.st_atime, stat.st_mtime), stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        collector.remove(path, "cache_cap")
+        total -= size
+
+
+def _collect_blobs(config: AppConfig, min_age_seconds: int, now: float, collector: _Collector) -> None:
+    store = blob_store_for(config)
+    if store is None:
+        return
+    for path, stat in store.iter_blobs():
+        # ctime aendert sich mit jedem Link; frische Blobs koennen gerade verlinkt werden.
+        if stat.st_nlink <= 1 and now - stat.st_ctime >= min_age_seconds:
+            collector.remove(path, "blobs")
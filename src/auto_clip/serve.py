@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import logging
+import mimetypes
+import os
+import re
+import socket
+from email.utils import formatdate
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+logger = logging.getLogger(__name__)
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+_CONTENT_TYPES = {
+    ".mp4": "video/mp4",
+    ".json": "application/json; charset=utf-8",
+    ".js": "text/javascript; charset=utf-8",
+    ".css": "text/css; charset=utf-8",
+    ".html": "text/html; charset=utf-8",
+    ".ppm": "image/x-portable-pixmap",
+    ".webp": "image/webp",
+}
+# Videos und Poster behalten ihre URL, wenn der volle Render die Vorschau
+# ersetzt; deshalb wird alles revalidiert, per ETag meist mit einem 304.
+_CACHE_CONTROL = "no-cache"
+
+
+def _content_type(path: Path) -> str:
+    suffix = path.suffix.lower()
+    if suffix in _CONTENT_TYPES:
+        return _CONTENT_TYPES[suffix]
+    return mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+
+
+def _etag(stat: os.stat_result, encoding: str = "") -> str:
+    suffix = f"-{encoding}" if encoding else ""
+    return f'"{stat.st_ino:x}-{stat.st_size:x}-{stat.st_mtime_ns:x}{suffix}"'
+
+
+def parse_range(header: str, size: int) -> tuple[int, int] | None:
+    """Wertet einen einzelnen `bytes=`-Bereich aus und liefert (start, ende inklusive).
+
+    Ungueltige oder nicht erfuellbare Bereiche ergeben `ValueError`;
+    Mehrfachbereiche werden ignoriert (`None`, also die ganze Datei).
+    """
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        if "," in header:
+            return None
+        raise ValueError(header)
+    first, last = match.groups()
+    if not first and not last:
+        raise ValueError(header)
+    if not first:
+        length = int(last)
+        if length == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+class StaticHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "auto-clip"
+    timeout = 75
+
+    @property
+    def public_root(self) -> Path:
+        return self.server.public_root
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def do_GET(self) -> None:
+        self._serve(send_body=True)
+
+    def do_HEAD(self) -> None:
+        self._serve(send_body=False)
+
+    def _resolve(self) -> Path | None:
+        # Das Public-Bundle wird per Rename ausgetauscht, daher pro Anfrage neu aufloesen.
+        root = self.public_root.resolve()
+        relative = unquote(urlsplit(self.path).path).lstrip("/")
+        try:
+            # `%00` ergibt ValueError, ueberlange Namen OSError: beides ist schlicht nicht vorhanden.
+            candidate = (root / relative).resolve()
+            if candidate != root and root not in candidate.parents:
+                return None
+            if candidate.is_dir():
+                candidate = candidate / "index.html"
+            return candidate if candidate.is_file() else None
+        except (ValueError, OSError):
+            return None
+
+    def _send_error(self, status: HTTPStatus, extra: dict[str, str] | None = None) -> None:
+        body = f"{status.value} {status.phrase}\n".encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (extra or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _serve(self, send_body: bool) -> None:
+        path = self._resolve()
+        if path is None:
+            self._send_error(HTTPStatus.NOT_FOUND)
+            return
+
+        range_header = self.headers.get("Range")
+        encoding = ""
+        body_path = path
+        gzip_sibling = path.with_name(path.name + ".gz")
+        if not range_header and "gzip" in self.headers.get("Accept-Encoding", "") and gzip_sibling.is_file():
+            body_path = gzip_sibling
+            encoding = "gzip"
+
+        try:
+            handle = body_path.open("rb")
+        except OSError:
+            self._send_error(HTTPStatus.NOT_FOUND)
+            return
+
+        with handle:
+            stat = os.fstat(handle.fileno())
+            size = stat.st_size
+            etag = _etag(stat, encoding)
+            headers = {
+                "Content-Type": _content_type(path),
+                "ETag": etag,
+                "Last-Modified": formatdate(stat.st_mtime, usegmt=True),
+                "Accept-Ranges": "bytes",
+                "Cache-Control": _CACHE_CONTROL,
+                "Vary": "Accept-Encoding",
+            }
+            if encoding:
+                headers["Content-Encoding"] = encoding
+
+            if etag in [value.strip() for value in self.headers.get("If-None-Match", "").split(",")]:
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                for name, value in headers.items():
+                    if name != "Content-Type":
+                        self.send_header(name, value)
+                self.end_headers()
+                return
+
+            status = HTTPStatus.OK
+            start, end = 0, size - 1
+            if range_header and size:
+                try:
+                    requested = parse_range(range_header, size)
+                except ValueError:
+                    self._send_error(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, {"Content-Range": f"bytes */{size}"})
+                    return
+                if requested is not None:
+                    start, end = requested
+                    status = HTTPStatus.PARTIAL_CONTENT
+                    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+
+            length = end - start + 1 if size else 0
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(length))
+            self.end_headers()
+            if send_body and length:
+                self._send_file(handle, start, length)
+
+    def _send_file(self, handle, offset: int, count: int) -> None:
+        """Schickt den Dateiinhalt per `sendfile` direkt aus dem Page-Cache in den Socket.
+
+        `socket.sendfile` nutzt `os.sendfile`, wartet bei Socket-Timeouts korrekt
+        auf Schreibbereitschaft und faellt nur ohne Kernel-Unterstuetzung auf
+        `send` zurueck.
+        """
+        self.connection.sendfile(handle, offset, count)
+
+
+class StaticServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address: tuple[str, int], public_root: Path) -> None:
+        self.public_root = public_root
+        super().__init__(address, StaticHandler)
+
+    def server_bind(self) -> None:
+        self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        super().server_bind()
+
+
+def serve(public_root: Path, host: str = "127.0.0.1", port: int = 8000) -> None:
+    server = StaticServer((host, port), public_root)
+    logger.info("Liefere %s unter http://%s:%s/ aus", public_root, host, server.server_address[1])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Server beendet.")
+    finally:
+        server.server_close()
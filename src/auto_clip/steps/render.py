@@ -1,100 +1,359 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import math
 import shutil
 import subprocess
+import uuid
+from dataclasses import replace
+from fractions import Fraction
 from pathlib import Path
+from typing import Iterable, Iterator
 
+from auto_clip.blobs import BlobStore, blob_store_for
 from auto_clip.config import AppConfig
 from auto_clip.fs_utils import copy_file, ensure_dir
 
 
-def _build_concat_file(staged_frames: list[Path], concat_file: Path, frame_rate: float) -> None:
-    duration = 1.0 / frame_rate
-    lines: list[str] = []
-    base_dir = concat_file.parent.resolve()
-    for frame in staged_frames:
-        relative_frame = frame.resolve().relative_to(base_dir).as_posix()
-        lines.append(f"file {relative_frame}")
-        lines.append(f"duration {duration:.6f}")
-    final_frame = staged_frames[-1].resolve().relative_to(base_dir).as_posix()
-    lines.append(f"file {final_frame}")
-    concat_file.write_text("\n".join(lines) + "\n", encoding="utf-8")
+SEGMENT_CACHE_VERSION = 2
+SEGMENT_MIN_FPS = 25
 
 
-def render_video(
-    *,
-    config: AppConfig,
-    frame_files: list[Path],
-    audio_file: Path,
-    job_video_dir: Path,
-    job_id: str,
-) -> dict:
-    if not frame_files:
-        raise ValueError("Keine Bilddateien fuer den Render gefunden")
+def _stage_frames(frame_files: Iterable[Path], staging_dir: Path, store: BlobStore | None = None) -> Iterator[str]:
+    """Legt Frames fortlaufend nummeriert ab und liefert den relativen Zielpfad.
 
-    ensure_dir(job_video_dir)
-    staging_dir = job_video_dir / "staged_frames"
-    if staging_dir.exists():
-        shutil.rmtree(staging_dir)
-    staging_dir.mkdir(parents=True)
-
-    staged_frames: list[Path] = []
+    Mit Blob-Store wird jeder Frame einmal abgelegt und nur verlinkt, sonst kopiert.
+    """
     for index, frame in enumerate(frame_files, start=1):
-        target = staging_dir / f"frame_{index:04d}{frame.suffix.lower()}"
-        copy_file(frame, target)
-        staged_frames.append(target)
+        name = f"frame_{index:04d}{frame.suffix.lower()}"
+        if store is not None:
+            store.place(frame, staging_dir / name)
+        else:
+            copy_file(frame, staging_dir / name)
+        yield f"{staging_dir.name}/{name}"
 
-    poster_path = job_video_dir / f"poster{staged_frames[0].suffix.lower()}"
-    copy_file(staged_frames[0], poster_path)
 
-    concat_file = job_video_dir / "frames.txt"
-    _build_concat_file(staged_frames, concat_file, config.render.frame_rate)
+def _collect(items: Iterable[str], target: list[str]) -> Iterator[str]:
+    for item in items:
+        target.append(item)
+        yield item
+
 
-    output_video = job_video_dir / f"{job_id}.mp4"
-    scale_filter = (
+def _write_concat_file(relative_frames: Iterable[str], concat_file: Path, frame_rate: float) -> tuple[int, str | None]:
+    """Schreibt die concat-Liste zeilenweise.
+
+    Gibt die Anzahl der Frames und den ersten Frame zurueck.
+    """
+    duration_line = f"duration {1.0 / frame_rate:.6f}\n"
+    count = 0
+    first_frame = None
+    last_frame = None
+    with concat_file.open("w", encoding="utf-8") as handle:
+        for relative_frame in relative_frames:
+            handle.write(f"file {relative_frame}\n")
+            handle.write(duration_line)
+            first_frame = first_frame or relative_frame
+            last_frame = relative_frame
+            count += 1
+        if last_frame is not None:
+            handle.write(f"file {last_frame}\n")
+    return count, first_frame
+
+
+def _scale_filter(config: AppConfig) -> str:
+    return (
         f"scale={config.render.width}:{config.render.height}:force_original_aspect_ratio=decrease,"
         f"pad={config.render.width}:{config.render.height}:(ow-iw)/2:(oh-ih)/2"
     )
 
-    command = [
-        config.ffmpeg_bin,
-        "-y",
-        "-f",
-        "concat",
-        "-safe",
-        "0",
-        "-i",
-        str(concat_file),
-        "-i",
-        str(audio_file),
-        "-vf",
-        scale_filter,
-        "-c:v",
-        config.render.codec,
-        "-crf",
-        str(config.render.crf),
-        "-pix_fmt",
-        "yuv420p",
-        "-c:a",
-        "aac",
-        "-b:a",
-        config.render.audio_bitrate,
-        "-movflags",
-        "+faststart",
-        "-shortest",
-        str(output_video),
-    ]
 
+def _preset_arguments(config: AppConfig) -> list[str]:
+    return ["-preset", config.render.preset] if config.render.preset else []
+
+
+def render_config_for_profile(config: AppConfig, profile: str) -> AppConfig:
+    """Leitet die Render-Einstellungen fuer ein Profil (`full` oder `preview`) ab."""
+    if profile == "full":
+        return config
+    if profile == "preview":
+        preview = config.preview
+        return replace(config, render=replace(
+            config.render,
+            width=preview.width,
+            height=preview.height,
+            crf=preview.crf,
+            preset=preview.preset,
+            segment_frames=0,
+        ))
+    raise ValueError(f"Unbekanntes Render-Profil: {profile}")
+
+
+def _run_ffmpeg(config: AppConfig, arguments: list[str]) -> None:
     try:
-        subprocess.run(command, check=True, capture_output=True, text=True)
+        subprocess.run([config.ffmpeg_bin, "-y", *arguments], check=True, capture_output=True, text=True)
     except FileNotFoundError as exc:
         raise RuntimeError(f"ffmpeg nicht gefunden: {config.ffmpeg_bin}") from exc
     except subprocess.CalledProcessError as exc:
         stderr = (exc.stderr or "").strip()
         raise RuntimeError(f"Render fehlgeschlagen: {stderr}") from exc
 
+
+def _concat_quote(path: Path) -> str:
+    return "'" + path.as_posix().replace("'", "'\\''") + "'"
+
+
+def segment_output_rate(frame_rate: float) -> tuple[Fraction, int]:
+    """Ausgabe-Framerate der Segmente als ganzzahliges Vielfaches der Diashow-Rate.
+
+    Jedes Bild wird genau `repeat` Ausgabeframes lang gezeigt. Damit ist jede
+    Segmentlaenge exakt `Bilder / frame_rate`, und die Segmente laufen nicht
+    gegen Zeitachse und Ton auseinander. Gibt `(rate, repeat)` zurueck.
+    """
+    source = Fraction(frame_rate).limit_denominator(1000)
+    repeat = max(math.ceil(SEGMENT_MIN_FPS / source), 1)
+    return source * repeat, repeat
+
+
+def _segment_key(config: AppConfig, frame_digests: list[str]) -> str:
+    payload = {
+        "version": SEGMENT_CACHE_VERSION,
+        "frames": frame_digests,
+        "frame_rate": config.render.frame_rate,
+        "width": config.render.width,
+        "height": config.render.height,
+        "codec": config.render.codec,
+        "crf": config.render.crf,
+        "preset": config.render.preset,
+        "output_rate": str(segment_output_rate(config.render.frame_rate)[0]),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _file_digest(path: Path) -> str:
+    with path.open("rb") as handle:
+        return hashlib.file_digest(handle, "sha256").hexdigest()
+
+
+def video_fingerprint(config: AppConfig, frame_files: Iterable[Path]) -> str:
+    """Hash ueber alle Eingaben, die die Videospur bestimmen: Frame-Inhalte und Render-Einstellungen."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps({
+        "frame_rate": config.render.frame_rate,
+        "width": config.render.width,
+        "height": config.render.height,
+        "codec": config.render.codec,
+        "crf": config.render.crf,
+        "preset": config.render.preset,
+        "segment_frames": config.render.segment_frames,
+    }, sort_keys=True).encode("utf-8"))
+    for frame in frame_files:
+        digest.update(_file_digest(frame).encode("ascii"))
+    return digest.hexdigest()
+
+
+def video_only_path(video_file: Path) -> Path:
+    """Ungekuerzte Videospur ohne Ton neben dem fertigen Clip, z. B. `10001.video.mp4`."""
+    return video_file.with_name(f"{video_file.stem}.video.mp4")
+
+
+def _mux_audio(config: AppConfig, video_only: Path, audio_file: Path, output_video: Path) -> None:
+    """Legt Videospur (Stream-Copy) und Ton (AAC) zusammen; Laenge wie beim Vollrender per `-shortest`."""
+    temp = output_video.with_name(f"{output_video.stem}.mux.tmp.mp4")
+    try:
+        _run_ffmpeg(config, [
+            "-i", str(video_only),
+            "-i", str(audio_file),
+            "-map", "0:v:0",
+            "-map", "1:a:0",
+            "-c:v", "copy",
+            "-c:a", "aac",
+            "-b:a", config.render.audio_bitrate,
+            "-movflags", "+faststart",
+            "-shortest",
+            str(temp),
+        ])
+        temp.replace(output_video)
+    finally:
+        temp.unlink(missing_ok=True)
+
+
+def remux_audio(
+    *,
+    config: AppConfig,
+    audio_file: Path,
+    video_file: Path,
+    poster_file: Path,
+    staged_frame_count: int,
+) -> dict:
+    """Tauscht nur die Tonspur: Video per Stream-Copy, Audio neu als AAC.
+
+    Quelle ist die ungekuerzte Videospur aus dem letzten Render, nicht der
+    fertige Clip; der ist schon auf die alte Tonlaenge gekuerzt.
+    """
+    _mux_audio(config, video_only_path(video_file), audio_file, video_file)
     return {
+        "video_file": video_file,
+        "poster_file": poster_file,
+        "staged_frame_count": staged_frame_count,
+        "mode": "remux",
+    }
+
+
+def _render_segments(
+    *,
+    config: AppConfig,
+    staged_frames: list[str],
+    job_video_dir: Path,
+    video_only: Path,
+) -> dict:
+    """Kodiert die Diashow in unabhaengige Segmente und setzt sie per Stream-Copy zusammen.
+
+    Jedes Segment beginnt mit einem Keyframe und wird ueber den Hash seiner
+    Frames und der Render-Einstellungen in `dist/cache/segments/` abgelegt. Nur
+    Segmente mit geaenderten Eingaben werden neu kodiert. Ergebnis ist die
+    Videospur ohne Ton unter `video_only`.
+    """
+    size = config.render.segment_frames
+    output_rate, repeat = segment_output_rate(config.render.frame_rate)
+    duration_line = f"duration {1.0 / config.render.frame_rate:.6f}\n"
+    cache_root = config.paths.build_root / "cache" / "segments"
+    segment_dir = job_video_dir / "segments"
+    if segment_dir.exists():
+        shutil.rmtree(segment_dir)
+    segment_dir.mkdir(parents=True)
+
+    segment_files: list[Path] = []
+    reused = 0
+    encoded = 0
+    for index, start in enumerate(range(0, len(staged_frames), size), start=1):
+        chunk = staged_frames[start:start + size]
+        key = _segment_key(config, [_file_digest(job_video_dir / frame) for frame in chunk])
+        cached = cache_root / key[:2] / f"{key}.mp4"
+        segment_files.append(cached)
+        if cached.exists():
+            reused += 1
+            continue
+
+        segment_list = segment_dir / f"segment_{index:04d}.txt"
+        with segment_list.open("w", encoding="utf-8") as handle:
+            for frame in chunk:
+                handle.write(f"file ../{frame}\n")
+                handle.write(duration_line)
+            handle.write(f"file ../{chunk[-1]}\n")
+
+        ensure_dir(cached.parent)
+        temp = cached.with_name(f"{key}.{uuid.uuid4().hex}.tmp.mp4")
+        try:
+            _run_ffmpeg(config, [
+                "-f", "concat", "-safe", "0", "-i", str(segment_list),
+                "-vf", _scale_filter(config),
+                "-c:v", config.render.codec,
+                "-crf", str(config.render.crf),
+                *_preset_arguments(config),
+                "-pix_fmt", "yuv420p",
+                "-r", f"{output_rate.numerator}/{output_rate.denominator}",
+                "-frames:v", str(len(chunk) * repeat),
+                "-an",
+                str(temp),
+            ])
+            temp.replace(cached)
+        finally:
+            temp.unlink(missing_ok=True)
+        encoded += 1
+
+    segments_list = segment_dir / "segments.txt"
+    segments_list.write_text(
+        "".join(f"file {_concat_quote(path.resolve())}\n" for path in segment_files),
+        encoding="utf-8",
+    )
+    _run_ffmpeg(config, [
+        "-f", "concat", "-safe", "0", "-i", str(segments_list),
+        "-c", "copy",
+        str(video_only),
+    ])
+
+    return {
+        "segment_frames": size,
+        "total": len(segment_files),
+        "reused": reused,
+        "encoded": encoded,
+    }
+
+
+def render_video(
+    *,
+    config: AppConfig,
+    frame_files: Iterable[Path],
+    audio_file: Path,
+    job_video_dir: Path,
+    job_id: str,
+    output_name: str | None = None,
+) -> dict:
+    ensure_dir(job_video_dir)
+    staging_dir = job_video_dir / "staged_frames"
+    if staging_dir.exists():
+        shutil.rmtree(staging_dir)
+    staging_dir.mkdir(parents=True)
+
+    segmented = config.render.segment_frames > 0
+    staged_frames: list[str] = []
+    store = blob_store_for(config)
+    staged = _stage_frames(frame_files, staging_dir, store)
+    if segmented:
+        staged = _collect(staged, staged_frames)
+
+    concat_file = job_video_dir / "frames.txt"
+    staged_frame_count, first_frame = _write_concat_file(
+        staged,
+        concat_file,
+        config.render.frame_rate,
+    )
+    if first_frame is None:
+        raise ValueError("Keine Bilddateien fuer den Render gefunden")
+
+    first_staged = job_video_dir / first_frame
+    poster_path = job_video_dir / f"poster{first_staged.suffix}"
+    if store is not None:
+        store.place(first_staged, poster_path)
+    else:
+        copy_file(first_staged, poster_path)
+
+    output_video = job_video_dir / (output_name or f"{job_id}.mp4")
+    result = {
         "video_file": output_video,
         "poster_file": poster_path,
-        "staged_frame_count": len(staged_frames),
+        "staged_frame_count": staged_frame_count,
+        "mode": "segmented" if segmented else "full",
     }
+
+    video_only = video_only_path(output_video)
+    if segmented:
+        result["segments"] = _render_segments(
+            config=config,
+            staged_frames=staged_frames,
+            job_video_dir=job_video_dir,
+            video_only=video_only,
+        )
+    else:
+        _run_ffmpeg(config, [
+            "-f",
+            "concat",
+            "-safe",
+            "0",
+            "-i",
+            str(concat_file),
+            "-vf",
+            _scale_filter(config),
+            "-c:v",
+            config.render.codec,
+            "-crf",
+            str(config.render.crf),
+            *_preset_arguments(config),
+            "-pix_fmt",
+            "yuv420p",
+            "-an",
+            str(video_only),
+        ])
+    _mux_audio(config, video_only, audio_file, output_video)
+    return result
@@ -1,27 +1,17 @@
 from __future__ import annotations
 
-from auto_clip.models import JobRequest
+from typing import Iterable
 
+from auto_clip.models import JobRequest
+from auto_clip.text_templates import TemplateSet, load_template_set
 
-def build_content(request: JobRequest) -> dict[str, str]:
-    vehicle = request.vehicle
 
-    headline = f"{vehicle.title} fuer {vehicle.price_eur:,} EUR".replace(",", ".")
-    summary = (
-        f"{vehicle.title} in {vehicle.color} mit {vehicle.power_hp} PS, "
-        f"{vehicle.transmission}, Baujahr {vehicle.year} und {vehicle.mileage_km:,} km."
-    ).replace(",", ".")
+def build_content(request: JobRequest, templates: TemplateSet | None = None) -> dict[str, str]:
+    template_set = templates or load_template_set()
+    return template_set.render(request.job_id, request.vehicle)
 
-    narration = (
-        f"Hier kommt {vehicle.title}. "
-        f"Baujahr {vehicle.year}, {vehicle.mileage_km:,} Kilometer, "
-        f"{vehicle.fuel}, {vehicle.power_hp} PS und {vehicle.transmission}. "
-        f"Der Preis liegt bei {vehicle.price_eur:,} Euro. "
-        f"Mehr Informationen findest du in der Anzeige."
-    ).replace(",", ".")
 
-    return {
-        "headline": headline,
-        "summary": summary,
-        "narration": narration,
-    }
+def render_many(requests: Iterable[JobRequest], templates: TemplateSet | None = None) -> list[dict[str, str]]:
+    """Erzeugt Texte fuer viele Jobs mit einem einzigen, vorkompilierten Vorlagensatz."""
+    template_set = templates or load_template_set()
+    return [template_set.render(request.job_id, request.vehicle) for request in requests]
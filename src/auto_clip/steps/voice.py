@@ -5,7 +5,8 @@ import wave
 from pathlib import Path
 
 from auto_clip.config import AppConfig
-from auto_clip.fs_utils import ensure_dir
+from auto_clip.fs_utils import copy_file, ensure_dir
+from auto_clip.tts import SpeechSynthesizer, wav_duration_seconds
 
 
 def _create_silence_wav(target: Path, duration_seconds: int, sample_rate: int = 44100) -> None:
@@ -24,6 +25,7 @@ def prepare_audio(
     source_wav: Path | None,
     target_wav: Path,
     narration_text: str,
+    synthesizer: SpeechSynthesizer | None = None,
 ) -> dict:
     ensure_dir(target_wav.parent)
     if source_wav and source_wav.exists():
@@ -34,6 +36,18 @@ def prepare_audio(
             "note": "Vorhandene WAV-Datei uebernommen.",
         }
 
+    if synthesizer is not None:
+        cached_wav, cache_hit = synthesizer.synthesize(narration_text)
+        copy_file(cached_wav, target_wav)
+        return {
+            "provider": synthesizer.provider.name,
+            "voice": synthesizer.voice,
+            "duration_seconds": wav_duration_seconds(target_wav),
+            "cache_key": cached_wav.stem,
+            "cache_hit": cache_hit,
+            "note": "Sprache aus dem TTS-Cache uebernommen." if cache_hit else "Sprache synthetisiert.",
+        }
+
     wortzahl = max(len(narration_text.split()), 1)
     fallback_duration = max(config.voice.fallback_duration_seconds, round(wortzahl / 2))
     _create_silence_wav(target_wav, fallback_duration)
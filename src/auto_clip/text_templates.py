@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from dataclasses import dataclass, fields
+from pathlib import Path
+from typing import Callable
+
+from auto_clip.models import VehicleData
+
+
+BUILTIN_TEMPLATE_ROOT = Path(__file__).resolve().parent / "templates"
+TEMPLATE_PARTS = ("headline", "summary", "narration")
+
+_TOKEN_RE = re.compile(r"\{\{|\}\}|\{([a-z_]+)(?::([a-z_]+))?\}|[{}]")
+_VEHICLE_FIELDS = {item.name for item in fields(VehicleData)}
+
+
+@dataclass(frozen=True)
+class NumberLocale:
+    thousands_sep: str
+    decimal_sep: str
+
+
+LOCALES = {
+    "de_DE": NumberLocale(thousands_sep=".", decimal_sep=","),
+    "de_AT": NumberLocale(thousands_sep=".", decimal_sep=","),
+    "de_CH": NumberLocale(thousands_sep="'", decimal_sep="."),
+    "en_US": NumberLocale(thousands_sep=",", decimal_sep="."),
+    "en_GB": NumberLocale(thousands_sep=",", decimal_sep="."),
+    "fr_FR": NumberLocale(thousands_sep=" ", decimal_sep=","),
+}
+
+
+def _format_number(value: object, locale: NumberLocale) -> str:
+    grouped = f"{int(value):,}"
+    return grouped.replace(",", locale.thousands_sep)
+
+
+def _format_decimal(value: object, locale: NumberLocale) -> str:
+    grouped = f"{float(value):,.1f}"
+    return grouped.translate(str.maketrans({",": locale.thousands_sep, ".": locale.decimal_sep}))
+
+
+def _format_text(value: object, _locale: NumberLocale) -> str:
+    return str(value)
+
+
+FORMATTERS: dict[str, Callable[[object, NumberLocale], str]] = {
+    "text": _format_text,
+    "number": _format_number,
+    "decimal": _format_decimal,
+}
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """Vorkompilierte Vorlage: ein `str.format`-Muster plus benoetigte Platzhalter."""
+
+    pattern: str
+    slots: tuple[tuple[str, str, str], ...]
+
+    def render(self, values: dict[str, str]) -> str:
+        return self.pattern.format_map(values)
+
+
+def compile_template(source: str) -> CompiledTemplate:
+    """Uebersetzt `{feld}` bzw. `{feld:format}` in ein `str.format`-Muster.
+
+    Geschweifte Klammern als Text werden als `{{` und `}}` geschrieben.
+    """
+    parts: list[str] = []
+    slots: dict[str, tuple[str, str, str]] = {}
+    position = 0
+    for match in _TOKEN_RE.finditer(source):
+        parts.append(source[position:match.start()])
+        position = match.end()
+        token = match.group(0)
+        if token in ("{{", "}}"):
+            parts.append(token)
+            continue
+        field_name, formatter = match.group(1), match.group(2) or "text"
+        if field_name is None:
+            raise ValueError(f"Einzelne Klammer in Vorlage an Position {match.start()}")
+        if field_name not in _VEHICLE_FIELDS and field_name != "job_id":
+            raise ValueError(f"Unbekanntes Feld in Vorlage: {field_name}")
+        if formatter not in FORMATTERS:
+            raise ValueError(f"Unbekanntes Format in Vorlage: {formatter}")
+        key = f"{field_name}__{formatter}"
+        slots[key] = (key, field_name, formatter)
+        parts.append("{" + key + "}")
+    parts.append(source[position:])
+    return CompiledTemplate(pattern="".join(parts), slots=tuple(slots.values()))
+
+
+_COMPILED_BY_HASH: dict[str, CompiledTemplate] = {}
+
+
+def _compile_cached(source: str) -> CompiledTemplate:
+    digest = hashlib.sha256(source.encode("utf-8")).hexdigest()
+    compiled = _COMPILED_BY_HASH.get(digest)
+    if compiled is None:
+        compiled = compile_template(source)
+        _COMPILED_BY_HASH[digest] = compiled
+    return compiled
+
+
+def _read_template_source(path: Path) -> str:
+    lines = [line.strip() for line in path.read_text(encoding="utf-8").splitlines()]
+    return " ".join(line for line in lines if line and not line.startswith("#"))
+
+
+@dataclass(frozen=True)
+class TemplateSet:
+    locale_name: str
+    locale: NumberLocale
+    templates: dict[str, CompiledTemplate]
+    slots: tuple[tuple[str, str, str], ...]
+
+    def render(self, job_id: str, vehicle: VehicleData) -> dict[str, str]:
+        values: dict[str, str] = {}
+        for key, field_name, formatter in self.slots:
+            raw = job_id if field_name == "job_id" else getattr(vehicle, field_name)
+            values[key] = FORMATTERS[formatter](raw, self.locale)
+        return {part: template.render(values) for part, template in self.templates.items()}
+
+
+_SETS_BY_SIGNATURE: dict[tuple, TemplateSet] = {}
+
+
+def _stat_signature(path: Path) -> tuple[int, int]:
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def load_template_set(template_dir: Path | None = None, locale: str = "de_DE") -> TemplateSet:
+    """Laedt Vorlagen fuer Headline, Summary und Narration.
+
+    Ohne `template_dir` werden die mitgelieferten Vorlagen fuer die Sprache des
+    Locales verwendet. Kompilierte Vorlagen werden per Datei-Hash im Prozess
+    gecacht; solange sich mtime und Groesse der Dateien nicht aendern, wird nicht
+    einmal neu gelesen.
+    """
+    if locale not in LOCALES:
+        raise ValueError(f"Unbekanntes Locale: {locale}")
+    root = template_dir or BUILTIN_TEMPLATE_ROOT / locale.split("_")[0]
+
+    files = {part: root / f"{part}.txt" for part in TEMPLATE_PARTS}
+    try:
+        stats = tuple((part, *_stat_signature(path)) for part, path in files.items())
+    except FileNotFoundError as exc:
+        raise FileNotFoundError(f"Vorlage nicht gefunden: {exc.filename}") from exc
+
+    signature = (str(root.resolve()), locale, stats)
+    cached = _SETS_BY_SIGNATURE.get(signature)
+    if cached is not None:
+        return cached
+
+    templates = {part: _compile_cached(_read_template_source(path)) for part, path in files.items()}
+    slots: dict[str, tuple[str, str, str]] = {}
+    for template in templates.values():
+        for slot in template.slots:
+            slots[slot[0]] = slot
+
+    template_set = TemplateSet(
+        locale_name=locale,
+        locale=LOCALES[locale],
+        templates=templates,
+        slots=tuple(slots.values()),
+    )
+    _SETS_BY_SIGNATURE[signature] = template_set
+    return template_set
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import hashlib
+import importlib
+import json
+import logging
+import math
+import struct
+import threading
+import uuid
+import wave
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Protocol
+
+from auto_clip.config import AppConfig, VoiceConfig
+from auto_clip.fs_utils import ensure_dir
+
+logger = logging.getLogger(__name__)
+
+
+class TtsProvider(Protocol):
+    """Schnittstelle fuer Sprachsynthese-Anbieter.
+
+    `settings()` muss alles liefern, was den Klang beeinflusst; es fliesst in
+    den Cache-Schluessel ein.
+    """
+
+    name: str
+
+    def settings(self) -> dict: ...
+
+    def synthesize(self, text: str, voice: str, target_wav: Path) -> None: ...
+
+
+class OfflineToneProvider:
+    """Deterministischer Offline-Anbieter: ein kurzer Ton pro Wort.
+
+    Ersetzt echte Sprache in Tests und lokalen Laeufen ohne Netzwerk; gleicher
+    Text und gleiche Stimme ergeben byte-identische WAV-Dateien.
+    """
+
+    name = "offline"
+
+    def __init__(self, sample_rate: int = 22050, word_seconds: float = 0.3, pause_seconds: float = 0.08) -> None:
+        self.sample_rate = sample_rate
+        self.word_seconds = word_seconds
+        self.pause_seconds = pause_seconds
+
+    def settings(self) -> dict:
+        return {
+            "sample_rate": self.sample_rate,
+            "word_seconds": self.word_seconds,
+            "pause_seconds": self.pause_seconds,
+        }
+
+    def synthesize(self, text: str, voice: str, target_wav: Path) -> None:
+        word_frames = int(self.word_seconds * self.sample_rate)
+        pause = b"\x00\x00" * int(self.pause_seconds * self.sample_rate)
+        chunks: list[bytes] = []
+        for word in text.split() or [""]:
+            seed = hashlib.sha256(f"{voice}:{word}".encode("utf-8")).digest()
+            frequency = 180 + seed[0] * 2
+            step = 2 * math.pi * frequency / self.sample_rate
+            samples = [int(6000 * math.sin(step * index)) for index in range(word_frames)]
+            chunks.append(struct.pack(f"<{word_frames}h", *samples))
+            chunks.append(pause)
+
+        ensure_dir(target_wav.parent)
+        with wave.open(str(target_wav), "wb") as handle:
+            handle.setnchannels(1)
+            handle.setsampwidth(2)
+            handle.setframerate(self.sample_rate)
+            handle.writeframes(b"".join(chunks))
+
+
+PROVIDERS: dict[str, Callable[[VoiceConfig], TtsProvider]] = {
+    "offline": lambda _voice: OfflineToneProvider(),
+}
+
+
+def register_provider(name: str, factory: Callable[[VoiceConfig], TtsProvider]) -> None:
+    PROVIDERS[name] = factory
+
+
+def load_provider(voice: VoiceConfig) -> TtsProvider | None:
+    """Liefert den konfigurierten Anbieter.
+
+    `voice.provider` ist entweder ein registrierter Name oder ein Importpfad
+    `paket.modul:Fabrik`; die Fabrik bekommt die `VoiceConfig`.
+    """
+    if not voice.provider:
+        return None
+    if voice.provider in PROVIDERS:
+        return PROVIDERS[voice.provider](voice)
+    if ":" in voice.provider:
+        module_name, attribute = voice.provider.split(":", 1)
+        factory = getattr(importlib.import_module(module_name), attribute)
+        return factory(voice)
+    raise ValueError(f"Unbekannter TTS-Provider: {voice.provider}")
+
+
+def wav_duration_seconds(path: Path) -> float:
+    with wave.open(str(path), "rb") as handle:
+        return round(handle.getnframes() / handle.getframerate(), 3)
+
+
+class SpeechSynthesizer:
+    """Synthese mit Inhalts-Cache und begrenztem Thread-Pool.
+
+    Der Cache-Schluessel ist ein Hash aus Text, Stimme, Anbieter und dessen
+    Einstellungen. Identische Anfragen werden auch waehrend sie noch laufen
+    zusammengefasst, sodass kein Text zweimal synthetisiert wird.
+    """
+
+    def __init__(self, provider: TtsProvider, *, voice: str, cache_dir: Path, max_workers: int = 2) -> None:
+        self.provider = provider
+        self.voice = voice
+        self.cache_dir = cache_dir
+        self._executor = ThreadPoolExecutor(max_workers=max(max_workers, 1), thread_name_prefix="tts")
+        self._pending: dict[str, Future] = {}
+        self._lock = threading.RLock()
+
+    def cache_key(self, text: str) -> str:
+        payload = {
+            "text": text,
+            "voice": self.voice,
+            "provider": self.provider.name,
+            "settings": self.provider.settings(),
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+    def cache_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.wav"
+
+    def _synthesize_into_cache(self, text: str, key: str) -> Path:
+        target = self.cache_path(key)
+        if target.exists():
+            return target
+        ensure_dir(target.parent)
+        temp = target.with_name(f"{target.stem}.{uuid.uuid4().hex}.tmp.wav")
+        try:
+            self.provider.synthesize(text, self.voice, temp)
+            temp.replace(target)
+        finally:
+            temp.unlink(missing_ok=True)
+        logger.info("Sprache synthetisiert: %s (%s)", key[:12], self.provider.name)
+        return target
+
+    def submit(self, text: str) -> Future:
+        """Startet die Synthese im Hintergrund, falls sie nicht schon gecacht ist."""
+        key = self.cache_key(text)
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._executor.submit(self._synthesize_into_cache, text, key)
+                self._pending[key] = future
+                future.add_done_callback(lambda _done, key=key: self._forget(key))
+            return future
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def synthesize(self, text: str) -> tuple[Path, bool]:
+        """Liefert die gecachte WAV-Datei und ob sie schon vorhanden war."""
+        key = self.cache_key(text)
+        with self._lock:
+            pending = key in self._pending
+        if not pending and self.cache_path(key).exists():
+            return self.cache_path(key), True
+        return self.submit(text).result(), pending
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+def build_synthesizer(config: AppConfig) -> SpeechSynthesizer | None:
+    provider = load_provider(config.voice)
+    if provider is None:
+        return None
+    return SpeechSynthesizer(
+        provider,
+        voice=config.voice.voice,
+        cache_dir=config.paths.build_root / "cache" / "tts",
+        max_workers=config.voice.max_workers,
+    )
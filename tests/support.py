@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import sys
+from dataclasses import replace
+from pathlib import Path
+
+from auto_clip.config import AppConfig, PathConfig, RenderConfig, VoiceConfig, WatchConfig
+
+
+FAKE_FFMPEG = f"""#!{sys.executable}
+import sys
+from pathlib import Path
+Path(sys.argv[-1]).write_text(" ".join(sys.argv[1:]), encoding="utf-8")
+"""
+
+
+def write_fake_ffmpeg(root: Path) -> Path:
+    """Legt ein ffmpeg-Double an, das seine Argumente in die Zieldatei schreibt."""
+    ffmpeg_bin = root / "ffmpeg"
+    ffmpeg_bin.write_text(FAKE_FFMPEG, encoding="utf-8")
+    ffmpeg_bin.chmod(0o755)
+    return ffmpeg_bin
+
+
+def make_config(root: Path, *, ffmpeg_bin: Path | str = "ffmpeg", site_root: Path | None = None, **overrides) -> AppConfig:
+    """Testkonfiguration mit allen Pfaden unter `root`; `overrides` ersetzt AppConfig-Felder."""
+    config = AppConfig(
+        project_root=root,
+        config_path=root / "auto-clip.config.json",
+        paths=PathConfig(
+            jobs_inbox=root / "jobs" / "inbox",
+            jobs_working=root / "jobs" / "working",
+            jobs_done=root / "jobs" / "done",
+            jobs_failed=root / "jobs" / "failed",
+            build_root=root / "dist",
+            site_root=site_root or root / "site",
+        ),
+        render=RenderConfig(frame_rate=1.0, width=640, height=360, codec="libx264", crf=20, audio_bitrate="192k"),
+        watch=WatchConfig(poll_seconds=5),
+        voice=VoiceConfig(fallback_duration_seconds=8),
+        base_url="http://localhost:8000",
+        ffmpeg_bin=str(ffmpeg_bin),
+        ffprobe_bin="ffprobe",
+    )
+    return replace(config, **overrides) if overrides else config
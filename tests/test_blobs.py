@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from auto_clip.blobs import BlobStore
+from auto_clip.config import RetentionConfig
+from auto_clip.retention import collect_garbage
+from auto_clip.steps.render import _stage_frames
+
+from support import make_config
+
+
+class BlobStoreTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self.store = BlobStore(self.root / "dist" / "blobs")
+
+        frames = self.root / "frames"
+        frames.mkdir()
+        (frames / "intro.ppm").write_bytes(b"i" * 1000)
+        (frames / "auto.ppm").write_bytes(b"a" * 500)
+        self.frames = frames
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_shared_frames_are_stored_once(self) -> None:
+        for job_id in ["10001", "10002", "10003"]:
+            staging = self.root / "dist" / "jobs" / job_id / "video" / "staged_frames"
+            staging.mkdir(parents=True)
+            list(_stage_frames([self.frames / "intro.ppm", self.frames / "auto.ppm"], staging, self.store))
+
+        staged = self.root / "dist" / "jobs" / "10002" / "video" / "staged_frames" / "frame_0001.ppm"
+        self.assertEqual(staged.read_bytes(), b"i" * 1000)
+        self.assertEqual(staged.stat().st_nlink, 4)
+
+        stats = self.store.stats(self.root / "dist" / "jobs")
+        self.assertEqual(stats["blob_count"], 2)
+        self.assertEqual(stats["reference_count"], 6)
+        self.assertEqual(stats["unique_bytes"], 1500)
+        self.assertEqual(stats["bytes_saved"], 3000)
+        self.assertEqual(stats["dedup_ratio"], 3.0)
+
+    def test_bundle_links_do_not_count_as_dedup(self) -> None:
+        video = self.root / "dist" / "jobs" / "10001" / "video" / "10001.mp4"
+        video.parent.mkdir(parents=True)
+        video.write_bytes(b"v" * 1010)
+        digest = self.store.put(video, adopt=True)
+        for build in ["20260101T000000-aaaa", "20260102T000000-bbbb"]:
+            self.store.link(digest, self.root / "dist" / "public-builds" / build / "videos" / "10001.mp4")
+
+        stats = self.store.stats(self.root / "dist" / "jobs")
+        self.assertEqual(stats["reference_count"], 1)
+        self.assertEqual(stats["other_links"], 2)
+        self.assertEqual(stats["bytes_saved"], 0)
+        self.assertEqual(stats["dedup_ratio"], 1.0)
+
+    def test_relinking_over_existing_link_keeps_content(self) -> None:
+        target = self.root / "posters" / "10001.ppm"
+        digest = self.store.place(self.frames / "auto.ppm", target)
+        self.assertTrue(self.store.link(digest, target))
+        self.assertEqual(target.read_bytes(), b"a" * 500)
+        self.assertEqual(target.stat().st_nlink, 2)
+
+    def test_gc_removes_only_unreferenced_blobs(self) -> None:
+        keep = self.root / "links" / "10001.ppm"
+        drop = self.root / "links" / "10002.ppm"
+        self.store.place(self.frames / "intro.ppm", keep)
+        self.store.place(self.frames / "auto.ppm", drop)
+        drop.unlink()
+
+        config = make_config(self.root, retention=RetentionConfig(min_age_seconds=0))
+        report = collect_garbage(config)
+        self.assertEqual(report["bytes_by_reason"]["blobs"], 500)
+        self.assertEqual(self.store.stats()["blob_count"], 1)
+        self.assertEqual(keep.read_bytes(), b"i" * 1000)
+
+
+if __name__ == "__main__":
+    unittest.main()
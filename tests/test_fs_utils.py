@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import unittest
+from unittest import mock
+from pathlib import Path
+
+from auto_clip import fs_utils
+from auto_clip.fs_utils import copy_file_hashed, count_frame_files, iter_frame_files, list_frame_files
+from auto_clip.steps.render import _write_concat_file
+
+
+class FrameListingTest(unittest.TestCase):
+    def test_frames_are_listed_in_natural_order(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            frame_dir = Path(tmp)
+            for name in ["frame_10.jpg", "frame_2.JPG", "frame_1.png", "notiz.txt"]:
+                (frame_dir / name).touch()
+            (frame_dir / "unterordner.jpg").mkdir()
+
+            names = [path.name for path in iter_frame_files(frame_dir)]
+            self.assertEqual(names, ["frame_1.png", "frame_2.JPG", "frame_10.jpg"])
+            self.assertEqual(count_frame_files(frame_dir), 3)
+            self.assertEqual(list_frame_files(frame_dir), [frame_dir / name for name in names])
+
+    def test_concat_file_is_written_line_by_line(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            concat_file = Path(tmp) / "frames.txt"
+            count, first = _write_concat_file(iter(["a/1.jpg", "a/2.jpg"]), concat_file, 2.0)
+            self.assertEqual((count, first), (2, "a/1.jpg"))
+            self.assertEqual(concat_file.read_text(encoding="utf-8").splitlines(), [
+                "file a/1.jpg",
+                "duration 0.500000",
+                "file a/2.jpg",
+                "duration 0.500000",
+                "file a/2.jpg",
+            ])
+
+
+class HashedCopyTest(unittest.TestCase):
+    def test_copy_reports_size_and_digest_across_chunks(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / "quelle.mp4"
+            payload = os.urandom(10_000)
+            source.write_bytes(payload)
+            target = Path(tmp) / "public" / "videos" / "10001.mp4"
+
+            with mock.patch.object(fs_utils, "COPY_CHUNK_BYTES", 4096):
+                size, digest = copy_file_hashed(source, target)
+
+            self.assertEqual(size, 10_000)
+            self.assertEqual(digest, hashlib.sha256(payload).hexdigest())
+            self.assertEqual(target.read_bytes(), payload)
+            self.assertEqual(list(target.parent.iterdir()), [target])
+
+
+if __name__ == "__main__":
+    unittest.main()
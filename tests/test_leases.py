@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+import tempfile
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from auto_clip.cli import _finish_manifest
+from auto_clip import leases
+from auto_clip.leases import claim_manifest, lease_path_for, owns_lease, reclaim_expired_leases, release_lease, renew_lease
+
+
+def _claim_worker(inbox: str, working: str, result_file: str) -> None:
+    claimed_names: list[str] = []
+    for manifest in sorted(Path(inbox).glob("*.json")):
+        claimed = claim_manifest(manifest, Path(working), lease_seconds=60)
+        if claimed is not None:
+            claimed_names.append(claimed.manifest_path.name)
+    Path(result_file).write_text(json.dumps(claimed_names), encoding="utf-8")
+
+
+def _stale_owner_worker(inbox: str, working: str, done: str, failed: str, fail: bool, claimed_event, finish_event) -> None:
+    claimed = claim_manifest(Path(inbox) / "10001.json", Path(working), lease_seconds=1)
+    claimed_event.set()
+    finish_event.wait(10)
+    _finish_manifest(claimed, Path(done), Path(failed), lost=False, error=RuntimeError("kaputt") if fail else None)
+
+
+class LeaseTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        root = Path(self._tmp.name)
+        self.inbox = root / "inbox"
+        self.working = root / "working"
+        self.failed = root / "failed"
+        for path in [self.inbox, self.working, self.failed]:
+            path.mkdir()
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_concurrent_workers_claim_each_manifest_once(self) -> None:
+        for index in range(40):
+            (self.inbox / f"{index:05d}.json").write_text("{}", encoding="utf-8")
+
+        result_files = [Path(self._tmp.name) / f"worker-{index}.json" for index in range(4)]
+        processes = [
+            multiprocessing.Process(target=_claim_worker, args=(str(self.inbox), str(self.working), str(result)))
+            for result in result_files
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+        claimed = [name for result in result_files for name in json.loads(result.read_text(encoding="utf-8"))]
+        self.assertEqual(len(claimed), 40)
+        self.assertEqual(len(set(claimed)), 40)
+        self.assertEqual(list(self.inbox.glob("*.json")), [])
+
+    def test_expired_lease_returns_manifest_to_inbox(self) -> None:
+        (self.inbox / "10001.json").write_text("{}", encoding="utf-8")
+        claimed = claim_manifest(self.inbox / "10001.json", self.working, lease_seconds=60)
+        self.assertIsNotNone(claimed)
+
+        self.assertEqual(reclaim_expired_leases(
+            self.working, self.inbox, self.failed, lease_seconds=60, max_attempts=3,
+        ), [])
+
+        reclaimed = reclaim_expired_leases(
+            self.working, self.inbox, self.failed, lease_seconds=60, max_attempts=3, now=time.time() + 120,
+        )
+        self.assertEqual(reclaimed[0]["target"], "inbox")
+        self.assertTrue((self.inbox / "10001.json").exists())
+        self.assertFalse(lease_path_for(claimed.manifest_path).exists())
+        self.assertFalse(renew_lease(claimed, lease_seconds=60))
+
+        second = claim_manifest(self.inbox / "10001.json", self.working, lease_seconds=60)
+        self.assertEqual(second.lease.attempt, 2)
+
+    def test_exhausted_attempts_move_manifest_to_failed(self) -> None:
+        (self.inbox / "10001.json").write_text("{}", encoding="utf-8")
+        claim_manifest(self.inbox / "10001.json", self.working, lease_seconds=60)
+
+        reclaimed = reclaim_expired_leases(
+            self.working, self.inbox, self.failed, lease_seconds=60, max_attempts=1, now=time.time() + 120,
+        )
+        self.assertEqual(reclaimed[0]["target"], "failed")
+        self.assertTrue((self.failed / "10001.json").exists())
+        self.assertTrue((self.failed / "10001.error.txt").exists())
+
+    def test_stale_owner_leaves_reclaimed_manifest_alone(self) -> None:
+        done = Path(self._tmp.name) / "done"
+        done.mkdir()
+        for fail in [False, True]:
+            with self.subTest(fail=fail):
+                (self.inbox / "10001.json").write_text("{}", encoding="utf-8")
+                claimed_event = multiprocessing.Event()
+                finish_event = multiprocessing.Event()
+                stale = multiprocessing.Process(target=_stale_owner_worker, args=(
+                    str(self.inbox), str(self.working), str(done), str(self.failed), fail, claimed_event, finish_event,
+                ))
+                stale.start()
+                self.assertTrue(claimed_event.wait(10))
+
+                reclaim_expired_leases(
+                    self.working, self.inbox, self.failed, lease_seconds=1, max_attempts=5, now=time.time() + 120,
+                )
+                current = claim_manifest(self.inbox / "10001.json", self.working, lease_seconds=60)
+                self.assertIsNotNone(current)
+
+                finish_event.set()
+                stale.join(10)
+                self.assertEqual(stale.exitcode, 0)
+
+                self.assertTrue(current.manifest_path.exists())
+                self.assertTrue(renew_lease(current, lease_seconds=60))
+                self.assertEqual(list(done.iterdir()), [])
+                self.assertEqual(list(self.failed.iterdir()), [])
+
+                current.manifest_path.unlink()
+                release_lease(current)
+
+    def test_reaper_with_stale_view_leaves_fresh_lease_alone(self) -> None:
+        (self.inbox / "10001.json").write_text("{}", encoding="utf-8")
+        expired = claim_manifest(self.inbox / "10001.json", self.working, lease_seconds=1)
+        reclaim_expired_leases(
+            self.working, self.inbox, self.failed, lease_seconds=1, max_attempts=5, now=time.time() + 120,
+        )
+        fresh = claim_manifest(self.inbox / "10001.json", self.working, lease_seconds=600)
+        self.assertIsNotNone(fresh)
+
+        # Ein zweiter Aufraeumer hat noch die alte, abgelaufene Lease gelesen.
+        read_lease = leases._read_lease
+        stale_views = [expired.lease]
+        with mock.patch.object(leases, "_read_lease", lambda path: stale_views.pop() if stale_views else read_lease(path)):
+            reclaimed = reclaim_expired_leases(
+                self.working, self.inbox, self.failed, lease_seconds=1, max_attempts=5, now=time.time() + 120,
+            )
+
+        self.assertEqual(reclaimed, [])
+        self.assertTrue(fresh.manifest_path.exists())
+        self.assertTrue(owns_lease(fresh))
+        self.assertEqual(list(self.inbox.iterdir()), [])
+
+    def test_renewal_does_not_resurrect_reaped_lease(self) -> None:
+        (self.inbox / "10001.json").write_text("{}", encoding="utf-8")
+        claimed = claim_manifest(self.inbox / "10001.json", self.working, lease_seconds=1)
+
+        # Der Aufraeumer schlaegt zwischen Lesen und Rename der Erneuerung zu.
+        read_lease = leases._read_lease
+        reaped = []
+
+        def read_then_reap(path: Path):
+            lease = read_lease(path)
+            if not reaped:
+                reaped.append(True)
+                reclaim_expired_leases(
+                    self.working, self.inbox, self.failed, lease_seconds=1, max_attempts=5, now=time.time() + 120,
+                )
+            return lease
+
+        with mock.patch.object(leases, "_read_lease", read_then_reap):
+            self.assertFalse(renew_lease(claimed, lease_seconds=60))
+
+        self.assertFalse(claimed.lease_path.exists())
+        self.assertTrue((self.inbox / "10001.json").exists())
+        self.assertIsNotNone(claim_manifest(self.inbox / "10001.json", self.working, lease_seconds=60))
+
+    def test_release_removes_lease(self) -> None:
+        (self.inbox / "10001.json").write_text("{}", encoding="utf-8")
+        claimed = claim_manifest(self.inbox / "10001.json", self.working, lease_seconds=60)
+        self.assertTrue(renew_lease(claimed, lease_seconds=60))
+        claimed.manifest_path.unlink()
+        release_lease(claimed)
+        self.assertEqual(list(self.working.iterdir()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
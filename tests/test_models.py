@@ -35,6 +35,25 @@ class JobRequestTest(unittest.TestCase):
                 },
             })
 
+    def test_shard_namespace_is_reserved(self) -> None:
+        payload = {
+            "source": {"frame_dir": "examples/frames/10001"},
+            "vehicle": {
+                "title": "Beispielauto",
+                "price_eur": 10000,
+                "year": 2022,
+                "mileage_km": 25000,
+                "fuel": "Benzin",
+                "power_hp": 150,
+                "color": "Schwarz",
+                "transmission": "Automatik",
+                "listing_url": "https://beispiel.de/10001",
+            },
+        }
+        self.assertEqual(JobRequest.from_dict({**payload, "job_id": "_intern-7"}).job_id, "_intern-7")
+        with self.assertRaises(ValueError):
+            JobRequest.from_dict({**payload, "job_id": "_shards"})
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import unittest
+import wave
+from dataclasses import replace
+from pathlib import Path
+
+from auto_clip.layout import locate_job_dir, migrate_jobs
+from auto_clip.pipeline import process_manifest
+from auto_clip.steps.render import video_only_path
+
+from support import make_config, write_fake_ffmpeg
+
+
+MANIFEST = {
+    "job_id": "10001",
+    "source": {"frame_dir": "frames", "voice_wav": None},
+    "vehicle": {
+        "title": "Beispielauto",
+        "price_eur": 10000,
+        "year": 2022,
+        "mileage_km": 25000,
+        "fuel": "Benzin",
+        "power_hp": 150,
+        "color": "Schwarz",
+        "transmission": "Automatik",
+        "listing_url": "https://beispiel.de/10001",
+    },
+}
+
+
+class PipelineTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        site = self.root / "site"
+        site.mkdir()
+        (site / "index.html").write_text("ok", encoding="utf-8")
+
+        self.frame_dir = self.root / "frames"
+        self.frame_dir.mkdir()
+        for index in range(1, 4):
+            (self.frame_dir / f"frame_{index}.ppm").write_text(f"bild {index}", encoding="utf-8")
+
+        self.manifest = self.root / "10001.json"
+        self.manifest.write_text(json.dumps(MANIFEST), encoding="utf-8")
+
+        self.config = make_config(self.root, ffmpeg_bin=write_fake_ffmpeg(self.root), site_root=site)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_audio_only_change_is_remuxed(self) -> None:
+        first = process_manifest(self.manifest, self.config)
+        self.assertEqual(first["render"]["mode"], "full")
+
+        voice = self.root / "voice.wav"
+        voice.write_bytes(b"neue stimme")
+        payload = dict(MANIFEST, source={"frame_dir": "frames", "voice_wav": "voice.wav"})
+        self.manifest.write_text(json.dumps(payload), encoding="utf-8")
+
+        second = process_manifest(self.manifest, self.config)
+        self.assertEqual(second["render"]["mode"], "remux")
+        self.assertEqual(second["render"]["video_fingerprint"], first["render"]["video_fingerprint"])
+        video = self.root / second["artifacts"]["video_path"]
+        self.assertIn("-c:v copy", video.read_text(encoding="utf-8"))
+        self.assertTrue(second["qa"]["public"]["ok"])
+
+        (self.frame_dir / "frame_2.ppm").write_text("anderes bild", encoding="utf-8")
+        third = process_manifest(self.manifest, self.config)
+        self.assertEqual(third["render"]["mode"], "full")
+
+    def test_longer_narration_is_remuxed_from_untruncated_video_track(self) -> None:
+        first = process_manifest(self.manifest, self.config)
+        video = self.root / first["artifacts"]["video_path"]
+        track = video_only_path(video)
+        encode_args = track.read_text(encoding="utf-8")
+        self.assertIn("-an", encode_args)
+        self.assertNotIn("-shortest", encode_args)
+
+        voice = self.root / "voice.wav"
+        with wave.open(str(voice), "wb") as handle:
+            handle.setnchannels(1)
+            handle.setsampwidth(2)
+            handle.setframerate(8000)
+            handle.writeframes(b"\0\0" * 8000 * 30)
+        payload = dict(MANIFEST, source={"frame_dir": "frames", "voice_wav": "voice.wav"})
+        self.manifest.write_text(json.dumps(payload), encoding="utf-8")
+
+        second = process_manifest(self.manifest, self.config)
+        self.assertEqual(second["render"]["mode"], "remux")
+        remux_args = video.read_text(encoding="utf-8").split()
+        self.assertEqual(remux_args[remux_args.index("-i") + 1], str(track))
+        self.assertEqual(track.read_text(encoding="utf-8"), encode_args)
+
+        track.unlink()
+        third = process_manifest(self.manifest, self.config)
+        self.assertEqual(third["render"]["mode"], "full")
+
+    def test_preview_is_published_before_full_render(self) -> None:
+        preview = process_manifest(self.manifest, self.config, render_profile="preview")
+        self.assertEqual(preview["render"]["profile"], "preview")
+        self.assertEqual(preview["render"]["width"], 640)
+        preview_video = self.root / preview["artifacts"]["video_path"]
+        self.assertEqual(preview_video.name, "10001.preview.mp4")
+        preview_track = video_only_path(preview_video)
+        self.assertIn("-preset ultrafast", preview_track.read_text(encoding="utf-8"))
+
+        public_video = self.root / "dist" / "public" / "videos" / "10001.mp4"
+        self.assertIn(preview_track.name, public_video.read_text(encoding="utf-8"))
+
+        queued = self.root / "jobs" / "inbox" / "10001.full.json"
+        self.assertEqual(json.loads(queued.read_text(encoding="utf-8"))["render_profile"], "full")
+
+        full = process_manifest(queued, self.config)
+        self.assertEqual(full["render"]["profile"], "full")
+        self.assertFalse(preview_video.exists())
+        self.assertFalse(preview_track.exists())
+        self.assertIn("10001.video.mp4", public_video.read_text(encoding="utf-8"))
+
+    def test_flat_jobs_are_migrated_to_sharded_layout(self) -> None:
+        process_manifest(self.manifest, self.config)
+        sharded = replace(self.config, paths=replace(self.config.paths, job_layout="sharded"))
+
+        report = migrate_jobs(sharded)
+        self.assertEqual(report["moved"], ["10001"])
+        job_dir = locate_job_dir(sharded, "10001")
+        self.assertEqual(job_dir, self.root / "dist" / "jobs" / "_shards" / "69" / "f4" / "10001")
+        metadata = json.loads((job_dir / "metadata.json").read_text(encoding="utf-8"))
+        self.assertTrue(metadata["artifacts"]["video_path"].startswith("dist/jobs/_shards/69/f4/10001/"))
+
+        rerun = process_manifest(self.manifest, sharded)
+        self.assertEqual(rerun["render"]["mode"], "remux")
+        public_data = self.root / "dist" / "public" / "data" / "69" / "f4" / "10001.json"
+        self.assertEqual(json.loads(public_data.read_text(encoding="utf-8"))["public"]["video_url"], "./videos/69/f4/10001.mp4")
+        self.assertTrue(rerun["qa"]["public"]["ok"])
+        self.assertFalse((self.root / "dist" / "jobs" / "10001").exists())
+        self.assertEqual(migrate_jobs(sharded)["moved"], [])
+
+    def test_hex_job_ids_do_not_collide_with_shards(self) -> None:
+        jobs = self.root / "dist" / "jobs"
+        for job_id in ["12", "1080"]:
+            (jobs / job_id).mkdir(parents=True)
+            (jobs / job_id / "metadata.json").write_text(json.dumps({"job_id": job_id}), encoding="utf-8")
+        sharded = replace(self.config, paths=replace(self.config.paths, job_layout="sharded"))
+
+        report = migrate_jobs(sharded)
+        self.assertEqual(sorted(report["moved"]), ["1080", "12"])
+        self.assertEqual(sorted(path.name for path in jobs.iterdir()), ["_shards"])
+        for job_id in ["12", "1080"]:
+            job_dir = locate_job_dir(sharded, job_id)
+            self.assertEqual(job_dir.relative_to(jobs).parts[0], "_shards")
+            self.assertEqual(sorted(path.name for path in job_dir.iterdir()), ["metadata.json"])
+
+        self.manifest.write_text(json.dumps(dict(MANIFEST, job_id="_shards")), encoding="utf-8")
+        with self.assertRaises(ValueError):
+            process_manifest(self.manifest, self.config)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import tempfile
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from pathlib import Path
 
-from auto_clip.config import AppConfig, PathConfig, RenderConfig, VoiceConfig, WatchConfig
+from auto_clip.config import BlobConfig, PublishConfig
+from auto_clip.facets import build_facet_index
 from auto_clip.fs_utils import atomic_write_json, ensure_dir
 from auto_clip.publish import build_public_bundle
+from auto_clip.qa import audit_public_bundle
+
+from support import make_config
 
 
 class PublishBundleTest(unittest.TestCase):
@@ -46,31 +53,99 @@ class PublishBundleTest(unittest.TestCase):
                 },
             })
 
-            config = AppConfig(
-                project_root=root,
-                config_path=root / "auto-clip.config.json",
-                paths=PathConfig(
-                    jobs_inbox=root / "jobs" / "inbox",
-                    jobs_working=root / "jobs" / "working",
-                    jobs_done=root / "jobs" / "done",
-                    jobs_failed=root / "jobs" / "failed",
-                    build_root=root / "dist",
-                    site_root=site,
-                ),
-                render=RenderConfig(frame_rate=1.0, width=1280, height=720, codec="libx264", crf=20, audio_bitrate="192k"),
-                watch=WatchConfig(poll_seconds=5),
-                voice=VoiceConfig(fallback_duration_seconds=8),
-                base_url="http://localhost:8000",
-                ffmpeg_bin="ffmpeg",
-                ffprobe_bin="ffprobe",
-            )
+            config = make_config(root, site_root=site)
+
+            legacy = root / "dist" / "public"
+            ensure_dir(legacy)
+            (legacy / "alt.txt").write_text("alt", encoding="utf-8")
 
             report = build_public_bundle(config)
             self.assertEqual(report["job_count"], 1)
+            self.assertTrue(legacy.is_symlink())
+            self.assertFalse((legacy / "alt.txt").exists())
 
             catalog = json.loads((root / "dist" / "public" / "data" / "catalog.json").read_text(encoding="utf-8"))
             self.assertEqual(catalog["items"][0]["job_id"], "10001")
 
+            meta = json.loads((root / "dist" / "public" / "data" / "index" / "meta.json").read_text(encoding="utf-8"))
+            self.assertEqual(meta["row_count"], 1)
+            self.assertEqual(meta["dictionaries"]["fuel"], ["Benzin"])
+
+            public_root = root / "dist" / "public"
+            for variant in [config, replace(config, blobs=BlobConfig(enabled=False), publish=PublishConfig(copy_workers=2))]:
+                build_public_bundle(variant)
+                assets = json.loads((public_root / "data" / "asset-manifest.json").read_text(encoding="utf-8"))
+                self.assertEqual(assets["posters"]["10001"], "./posters/10001.ppm")
+                self.assertEqual(assets["files"]["videos/10001.mp4"], {
+                    "size": 5,
+                    "sha256": hashlib.sha256(b"video").hexdigest(),
+                })
+                self.assertTrue(audit_public_bundle(public_root, "10001", verify_checksums=True)["ok"])
+
+            builds = sorted(path.name for path in (root / "dist" / "public-builds").iterdir() if path.is_dir())
+            self.assertEqual(len(builds), 2)
+            self.assertIn(public_root.resolve().name, builds)
+
+            (public_root / "posters" / "10001.ppm").write_text("anders", encoding="utf-8")
+            report = audit_public_bundle(public_root, verify_checksums=True)
+            self.assertEqual(report["mismatched"], ["posters/10001.ppm"])
+
+
+    def test_concurrent_publishes_keep_active_build(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            site = root / "site"
+            site.mkdir()
+            (site / "index.html").write_text("ok", encoding="utf-8")
+            config = make_config(root, site_root=site)
+
+            with ThreadPoolExecutor(max_workers=6) as pool:
+                list(pool.map(lambda _index: build_public_bundle(config), range(12)))
+
+            public_root = root / "dist" / "public"
+            self.assertTrue(public_root.resolve().is_dir())
+            self.assertEqual((public_root / "index.html").read_text(encoding="utf-8"), "ok")
+            builds = [path for path in (root / "dist" / "public-builds").iterdir() if path.is_dir()]
+            self.assertLessEqual(len(builds), 2)
+
+
+class FacetIndexTest(unittest.TestCase):
+    def test_index_encodes_facets_and_ranges(self) -> None:
+        def item(job_id: str, fuel: str, price: int, year: int) -> dict:
+            return {
+                "job_id": job_id,
+                "vehicle": {
+                    "title": f"Auto {job_id}",
+                    "price_eur": price,
+                    "year": year,
+                    "mileage_km": 1000,
+                    "fuel": fuel,
+                    "color": "Rot",
+                    "transmission": "Manuell",
+                },
+            }
+
+        files = build_facet_index([
+            item("a", "Diesel", 30000, 2020),
+            item("b", "Benzin", 10000, 2022),
+            item("c", "Diesel", 20000, 2021),
+        ])
+
+        meta = files["meta.json"]
+        self.assertEqual(meta["dictionaries"]["fuel"], ["Benzin", "Diesel"])
+        self.assertEqual(files[meta["columns"]["fuel"]]["codes"], [1, 0, 1])
+        self.assertEqual(meta["counts"]["fuel"], [1, 2])
+        self.assertEqual(files[meta["postings"]["fuel"][1]]["rows"], [0, 2])
+
+        price = files[meta["ranges"]["price_eur"]["path"]]
+        self.assertEqual(price["values"], [10000, 20000, 30000])
+        self.assertEqual(price["rows"], [1, 2, 0])
+        self.assertEqual(files["rows-0.json"]["rows"][2], ["c", "Auto c", 20000])
+
+        many = build_facet_index([item(str(index), "Diesel", 20000, 2021) for index in range(2000)])
+        small = build_facet_index([item("a", "Diesel", 20000, 2021)])
+        self.assertLess(len(json.dumps(many["meta.json"])) - len(json.dumps(small["meta.json"])), 200)
+
 
 if __name__ == "__main__":
     unittest.main()
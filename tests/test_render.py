@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from dataclasses import replace
+from fractions import Fraction
+from pathlib import Path
+
+from auto_clip.fs_utils import iter_frame_files
+from auto_clip.steps.render import render_video, segment_output_rate
+
+from support import make_config, write_fake_ffmpeg
+
+
+class SegmentedRenderTest(unittest.TestCase):
+    def test_only_changed_segments_are_reencoded(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            ffmpeg_bin = write_fake_ffmpeg(root)
+
+            frame_dir = root / "frames"
+            frame_dir.mkdir()
+            for index in range(1, 7):
+                (frame_dir / f"frame_{index}.ppm").write_text(f"bild {index}", encoding="utf-8")
+            audio_file = root / "narration.wav"
+            audio_file.write_bytes(b"")
+
+            config = make_config(root, ffmpeg_bin=ffmpeg_bin)
+            config = replace(config, render=replace(config.render, segment_frames=2))
+            job_video_dir = root / "dist" / "jobs" / "10001" / "video"
+
+            def render() -> dict:
+                return render_video(
+                    config=config,
+                    frame_files=iter_frame_files(frame_dir),
+                    audio_file=audio_file,
+                    job_video_dir=job_video_dir,
+                    job_id="10001",
+                )
+
+            first = render()
+            self.assertEqual(first["mode"], "segmented")
+            self.assertEqual((first["segments"]["encoded"], first["segments"]["reused"]), (3, 0))
+            self.assertIn("+faststart", first["video_file"].read_text(encoding="utf-8"))
+            self.assertIn("-c:v copy", first["video_file"].read_text(encoding="utf-8"))
+            segment = next((root / "dist" / "cache" / "segments").rglob("*.mp4"))
+            self.assertIn("-r 25/1 -frames:v 50", segment.read_text(encoding="utf-8"))
+
+            (frame_dir / "frame_3.ppm").write_text("neues bild", encoding="utf-8")
+            second = render()
+            self.assertEqual((second["segments"]["encoded"], second["segments"]["reused"]), (1, 2))
+
+            full = render_video(
+                config=replace(config, render=replace(config.render, segment_frames=0)),
+                frame_files=iter_frame_files(frame_dir),
+                audio_file=audio_file,
+                job_video_dir=job_video_dir,
+                job_id="10001",
+            )
+            self.assertEqual(full["mode"], "full")
+            self.assertNotIn("segments", full)
+
+
+class SegmentRateTest(unittest.TestCase):
+    def test_segment_lengths_are_exact_frame_multiples(self) -> None:
+        rate, repeat = segment_output_rate(1.2)
+        self.assertEqual((rate, repeat), (Fraction(126, 5), 21))
+        self.assertEqual(10 * repeat / rate, Fraction(10) / Fraction(6, 5))
+        self.assertEqual(segment_output_rate(30.0), (Fraction(30), 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
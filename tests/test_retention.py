@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from auto_clip.config import RetentionConfig
+from auto_clip.fs_utils import atomic_write_json, ensure_dir
+from auto_clip.retention import collect_garbage
+
+from support import make_config
+
+
+class RetentionTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        for job_id in ["10001", "10002", "10003"]:
+            job_dir = self.root / "dist" / "jobs" / job_id
+            ensure_dir(job_dir / "video" / "staged_frames")
+            (job_dir / "request.json").write_text("{}", encoding="utf-8")
+            (job_dir / "video" / "staged_frames" / "frame_0001.ppm").write_bytes(b"x" * 100)
+            (job_dir / "video" / f"{job_id}.mp4").write_bytes(b"v" * 1000)
+            atomic_write_json(job_dir / "metadata.json", {"job_id": job_id, "qa": {"local": {"ok": True}}})
+            os.utime(job_dir / "request.json", (1, 1))
+
+        atomic_write_json(self.root / "dist" / "public" / "data" / "asset-manifest.json", {
+            "videos": {"10001": "./videos/10001.mp4"},
+            "posters": {},
+            "data": {"10001": "./data/10001.json"},
+        })
+
+        failed = self.root / "jobs" / "failed"
+        ensure_dir(failed)
+        for index in range(3):
+            manifest = failed / f"2000{index}.json"
+            manifest.write_text("{}", encoding="utf-8")
+            (failed / f"2000{index}.error.txt").write_text("kaputt", encoding="utf-8")
+            os.utime(manifest, (1000 + index, 1000 + index))
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_staging_failed_and_expired_jobs_are_removed(self) -> None:
+        config = make_config(self.root, retention=RetentionConfig(keep_failed=1))
+        report = collect_garbage(config, active_ids={"10001", "10002"})
+
+        jobs_root = self.root / "dist" / "jobs"
+        self.assertFalse((jobs_root / "10001" / "video" / "staged_frames").exists())
+        self.assertTrue((jobs_root / "10001" / "video" / "10001.mp4").exists())
+        self.assertFalse((jobs_root / "10003").exists())
+        self.assertEqual(sorted(path.name for path in (self.root / "jobs" / "failed").iterdir()), [
+            "20002.error.txt",
+            "20002.json",
+        ])
+        self.assertEqual(report["bytes_by_reason"]["staging"], 200)
+        self.assertGreater(report["bytes_by_reason"]["expired"], 1100)
+
+    def test_size_cap_keeps_published_jobs(self) -> None:
+        config = make_config(self.root, retention=RetentionConfig(max_job_bytes=0))
+        report = collect_garbage(config)
+
+        jobs_root = self.root / "dist" / "jobs"
+        self.assertTrue((jobs_root / "10001").exists())
+        self.assertFalse((jobs_root / "10002").exists())
+        self.assertFalse((jobs_root / "10003").exists())
+        self.assertEqual(report["protected_job_ids"], ["10001"])
+
+    def test_published_jobs_survive_expiry_and_empty_list_is_refused(self) -> None:
+        config = make_config(self.root, retention=RetentionConfig())
+        with self.assertRaises(ValueError):
+            collect_garbage(config, active_ids=set())
+        self.assertTrue((self.root / "dist" / "jobs" / "10002").exists())
+
+        report = collect_garbage(config, active_ids=set(), force=True)
+        jobs_root = self.root / "dist" / "jobs"
+        self.assertTrue((jobs_root / "10001" / "video" / "10001.mp4").exists())
+        self.assertFalse((jobs_root / "10002").exists())
+        self.assertNotIn(str(jobs_root / "10001"), report["removed"]["expired"])
+
+    def test_aborted_runs_are_not_treated_as_running_forever(self) -> None:
+        jobs_root = self.root / "dist" / "jobs"
+        for job_id in ["10004", "10005"]:
+            ensure_dir(jobs_root / job_id)
+            (jobs_root / job_id / "request.json").write_text("{}", encoding="utf-8")
+        os.utime(jobs_root / "10004" / "request.json", (1, 1))
+        os.utime(jobs_root / "10004", (1, 1))
+
+        config = make_config(self.root, retention=RetentionConfig(min_age_seconds=3600))
+        report = collect_garbage(config)
+        self.assertFalse((jobs_root / "10004").exists())
+        self.assertTrue((jobs_root / "10005").exists())
+        self.assertEqual(report["removed"]["incomplete"], [(jobs_root / "10004").as_posix()])
+
+    def test_dry_run_keeps_everything(self) -> None:
+        config = make_config(self.root, retention=RetentionConfig(keep_failed=0))
+        report = collect_garbage(config, active_ids=set(), dry_run=True, force=True)
+        self.assertGreater(report["bytes_reclaimed"], 0)
+        self.assertTrue((self.root / "dist" / "jobs" / "10003" / "video" / "staged_frames").exists())
+        self.assertEqual(len(list((self.root / "jobs" / "failed").iterdir())), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import tempfile
+import unittest
+from pathlib import Path
+
+from auto_clip.models import JobRequest
+from auto_clip.steps.script_text import build_content, render_many
+from auto_clip.text_templates import LOCALES, compile_template, load_template_set
+
+
+def _request(job_id: str = "10001", title: str = "Skoda Karoq 2,0 TDI") -> JobRequest:
+    return JobRequest.from_dict({
+        "job_id": job_id,
+        "source": {"frame_dir": "examples/frames/10001"},
+        "vehicle": {
+            "title": title,
+            "price_eur": 28990,
+            "year": 2022,
+            "mileage_km": 142350,
+            "fuel": "Diesel",
+            "power_hp": 150,
+            "color": "Schwarz",
+            "transmission": "Automatik",
+            "listing_url": "https://beispiel.de/10001",
+        },
+    })
+
+
+class ScriptTextTest(unittest.TestCase):
+    def test_default_templates_keep_commas_in_title(self) -> None:
+        content = build_content(_request())
+        self.assertEqual(content["headline"], "Skoda Karoq 2,0 TDI fuer 28.990 EUR")
+        self.assertIn("Baujahr 2022, 142.350 Kilometer, Diesel, 150 PS", content["narration"])
+        self.assertTrue(content["summary"].endswith("Baujahr 2022 und 142.350 km."))
+
+    def test_locale_controls_number_format(self) -> None:
+        content = build_content(_request(), load_template_set(locale="en_US"))
+        self.assertEqual(content["headline"], "Skoda Karoq 2,0 TDI for 28,990 EUR")
+
+    def test_every_locale_has_builtin_templates(self) -> None:
+        for locale in LOCALES:
+            with self.subTest(locale=locale):
+                self.assertEqual(load_template_set(locale=locale).locale_name, locale)
+        content = build_content(_request(), load_template_set(locale="fr_FR"))
+        self.assertEqual(content["headline"], "Skoda Karoq 2,0 TDI pour 28\u202f990 EUR")
+
+    def test_render_many_uses_custom_template_dir(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            (root / "headline.txt").write_text("{{{job_id}}} {title}\n", encoding="utf-8")
+            (root / "summary.txt").write_text("{mileage_km:number} km\n", encoding="utf-8")
+            (root / "narration.txt").write_text("# Kommentar\n{fuel}\n{year}\n", encoding="utf-8")
+            templates = load_template_set(root)
+
+            contents = render_many([_request("1", "A"), _request("2", "B")], templates)
+            self.assertEqual([item["headline"] for item in contents], ["{1} A", "{2} B"])
+            self.assertEqual(contents[0]["summary"], "142.350 km")
+            self.assertEqual(contents[0]["narration"], "Diesel 2022")
+            self.assertIs(load_template_set(root), templates)
+
+    def test_unknown_field_is_rejected(self) -> None:
+        with self.assertRaises(ValueError):
+            compile_template("{preis}")
+        with self.assertRaises(ValueError):
+            compile_template("{title:fett}")
+        with self.assertRaises(ValueError):
+            compile_template("offen { klammer")
+
+
+if __name__ == "__main__":
+    unittest.main()
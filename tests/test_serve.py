@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import gzip
+import http.client
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from auto_clip.serve import StaticServer
+
+
+class StaticServerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        root = Path(self._tmp.name) / "public"
+        (root / "videos").mkdir(parents=True)
+        (root / "index.html").write_text("<h1>ok</h1>", encoding="utf-8")
+        (root / "videos" / "10001.mp4").write_bytes(bytes(range(256)) * 40)
+        (root / "app.js").write_text("console.log(1);", encoding="utf-8")
+        (root / "app.js.gz").write_bytes(gzip.compress(b"console.log(1);"))
+        (Path(self._tmp.name) / "geheim.txt").write_text("nein", encoding="utf-8")
+
+        self.server = StaticServer(("127.0.0.1", 0), root)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.connection = http.client.HTTPConnection("127.0.0.1", self.server.server_address[1], timeout=5)
+
+    def tearDown(self) -> None:
+        self.connection.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self._tmp.cleanup()
+
+    def _get(self, path: str, headers: dict[str, str] | None = None) -> tuple[http.client.HTTPResponse, bytes]:
+        self.connection.request("GET", path, headers=headers or {})
+        response = self.connection.getresponse()
+        return response, response.read()
+
+    def test_range_request_returns_partial_content(self) -> None:
+        response, body = self._get("/videos/10001.mp4", {"Range": "bytes=10-19"})
+        self.assertEqual(response.status, 206)
+        self.assertEqual(response.getheader("Content-Range"), "bytes 10-19/10240")
+        self.assertEqual(body, bytes(range(10, 20)))
+
+        response, body = self._get("/videos/10001.mp4", {"Range": "bytes=-4"})
+        self.assertEqual(body, bytes(range(252, 256)))
+
+        response, _ = self._get("/videos/10001.mp4", {"Range": "bytes=999999-"})
+        self.assertEqual(response.status, 416)
+
+    def test_etag_revalidation_on_keep_alive_connection(self) -> None:
+        response, body = self._get("/")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, b"<h1>ok</h1>")
+        etag = response.getheader("ETag")
+
+        response, body = self._get("/index.html", {"If-None-Match": etag})
+        self.assertEqual(response.status, 304)
+        self.assertEqual(body, b"")
+
+    def test_replaced_video_is_revalidated(self) -> None:
+        response, _ = self._get("/videos/10001.mp4")
+        self.assertEqual(response.getheader("Cache-Control"), "no-cache")
+        etag = response.getheader("ETag")
+
+        video = Path(self._tmp.name) / "public" / "videos" / "10001.mp4"
+        replacement = video.with_name("10001.full.mp4")
+        replacement.write_bytes(bytes(reversed(range(256))) * 40)
+        replacement.replace(video)
+
+        response, body = self._get("/videos/10001.mp4", {"If-None-Match": etag})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("Cache-Control"), "no-cache")
+        self.assertEqual(body[:2], bytes([255, 254]))
+
+    def test_precompressed_sibling_is_served(self) -> None:
+        response, body = self._get("/app.js", {"Accept-Encoding": "gzip, br"})
+        self.assertEqual(response.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(gzip.decompress(body), b"console.log(1);")
+
+        response, body = self._get("/app.js")
+        self.assertIsNone(response.getheader("Content-Encoding"))
+        self.assertEqual(body, b"console.log(1);")
+
+    def test_paths_outside_root_are_rejected(self) -> None:
+        response, _ = self._get("/../geheim.txt")
+        self.assertEqual(response.status, 404)
+        response, _ = self._get("/%2e%2e/geheim.txt")
+        self.assertEqual(response.status, 404)
+
+    def test_malformed_paths_get_an_answer(self) -> None:
+        for path in ["/%00", "/index.html%00", "/" + "a" * 5000]:
+            with self.subTest(path=path[:20]):
+                response, _ = self._get(path)
+                self.assertEqual(response.status, 404)
+        response, body = self._get("/index.html")
+        self.assertEqual(body, b"<h1>ok</h1>")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from auto_clip.config import VoiceConfig
+from auto_clip.tts import OfflineToneProvider, SpeechSynthesizer, load_provider
+
+
+class _CountingProvider(OfflineToneProvider):
+    name = "zaehler"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def synthesize(self, text: str, voice: str, target_wav: Path) -> None:
+        with self._lock:
+            self.calls += 1
+        time.sleep(0.05)
+        super().synthesize(text, voice, target_wav)
+
+
+class SpeechSynthesizerTest(unittest.TestCase):
+    def test_offline_provider_is_deterministic(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp)
+            provider = load_provider(VoiceConfig(fallback_duration_seconds=8, provider="offline"))
+            provider.synthesize("Hallo Welt", "de-DE", root / "a.wav")
+            provider.synthesize("Hallo Welt", "de-DE", root / "b.wav")
+            self.assertEqual((root / "a.wav").read_bytes(), (root / "b.wav").read_bytes())
+
+    def test_identical_narration_is_synthesized_once(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            provider = _CountingProvider()
+            synthesizer = SpeechSynthesizer(provider, voice="de-DE", cache_dir=Path(tmp), max_workers=4)
+            try:
+                futures = [synthesizer.submit("Gleicher Text") for _ in range(8)]
+                futures.append(synthesizer.submit("Anderer Text"))
+                for future in futures:
+                    future.result()
+
+                path, cache_hit = synthesizer.synthesize("Gleicher Text")
+                self.assertTrue(cache_hit)
+                self.assertTrue(path.exists())
+                self.assertEqual(provider.calls, 2)
+            finally:
+                synthesizer.close()
+
+    def test_voice_changes_cache_key(self) -> None:
+        provider = OfflineToneProvider()
+        first = SpeechSynthesizer(provider, voice="de-DE", cache_dir=Path("."))
+        second = SpeechSynthesizer(provider, voice="en-US", cache_dir=Path("."))
+        try:
+            self.assertNotEqual(first.cache_key("Text"), second.cache_key("Text"))
+        finally:
+            first.close()
+            second.close()
+
+
+if __name__ == "__main__":
+    unittest.main()